@@ -1,5 +1,7 @@
+import copy
 import yaml
 import os
+from dataclasses import dataclass, fields, replace
 from platformdirs import user_config_dir
 import argparse
 
@@ -39,22 +41,162 @@ def load_args():
         help="Path to a custom configuration file.",
         type=str,
     )
+    # Read by bar.utils.profiler before the config is loaded; declared here so
+    # argparse accepts it
+    parser.add_argument(
+        "--profile-startup",
+        nargs="?",
+        const="text",
+        choices=["text", "chrome"],
+        help="Report the time spent in each startup phase.",
+    )
+    # Read by bar.utils.callbacks, like --profile-startup
+    parser.add_argument(
+        "--profile-callbacks",
+        action="store_true",
+        help="Record the time spent in each main-loop callback.",
+    )
 
     args = parser.parse_args()
     return args.config
 
 
-app_config = load_config() if not load_args() else load_config(load_args())
+class ConfigError(ValueError):
+    """Raised when the configuration does not have the expected shape."""
+
+
+# Top-level sections and their defaults when missing from the file
+SECTION_DEFAULTS = {
+    "vinyl": {"enable": False},
+    "battery": {"enable": False},
+    "window_title": {"enable": True},
+    "stylix": {"enable": False},
+    "calendar": {"enable": True, "khal_path": "khal"},
+    "notmuch": {"enable": True, "notmuch_path": "notmuch", "emacsclient_command": "emacsclient"},
+    "workspaces": {"animation": "padding"},
+    "player": {"enable": True},
+    "system_stats": {"enable": True},
+    "album_palette": {"enable": False},
+    "watchdog": {"enable": False, "stall_ms": 250},
+    "stylesheet": {"prune": False},
+}
+WORKSPACE_ANIMATIONS = ("padding", "drawn")
+
+
+@dataclass(frozen=True)
+class BarConfig:
+    """Validated configuration, one field per top-level key."""
+
+    vinyl: dict
+    battery: dict
+    window_title: dict
+    stylix: dict
+    calendar: dict
+    notmuch: dict
+    workspaces: dict
+    player: dict
+    system_stats: dict
+    album_palette: dict
+    watchdog: dict
+    stylesheet: dict
+    height: int = 40
+    log_level: str = "WARNING"
+    dev: bool = False
+
+    @classmethod
+    def from_dict(cls, raw) -> "BarConfig":
+        if not isinstance(raw, dict):
+            raise ConfigError("the configuration must be a mapping")
+
+        errors = []
+        sections = {}
+        for key, default in SECTION_DEFAULTS.items():
+            section = raw.get(key, default)
+            if not isinstance(section, dict):
+                errors.append(f"'{key}' must be a mapping")
+                section = default
+            elif not isinstance(section.get("enable", False), bool):
+                errors.append(f"'{key}.enable' must be true or false")
+            # A copy: update_config refills the running sections in place,
+            # which must never reach SECTION_DEFAULTS or the raw file data
+            sections[key] = copy.deepcopy(section)
+
+        if sections["workspaces"].get("animation", "padding") not in WORKSPACE_ANIMATIONS:
+            errors.append(f"'workspaces.animation' must be one of {', '.join(WORKSPACE_ANIMATIONS)}")
+        if not isinstance(sections["stylesheet"].get("prune", False), bool):
+            errors.append("'stylesheet.prune' must be true or false")
+        stall_ms = sections["watchdog"].get("stall_ms", 250)
+        if not isinstance(stall_ms, (int, float)) or isinstance(stall_ms, bool) or stall_ms <= 0:
+            errors.append("'watchdog.stall_ms' must be a positive number")
+        height = raw.get("height", 40)
+        if not isinstance(height, int) or isinstance(height, bool) or height <= 0:
+            errors.append("'height' must be a positive integer")
+        log_level = raw.get("logLevel", "WARNING")
+        if not isinstance(log_level, str):
+            errors.append("'logLevel' must be a string")
+        dev = raw.get("dev", False)
+        if not isinstance(dev, bool):
+            errors.append("'dev' must be true or false")
+
+        if errors:
+            raise ConfigError("; ".join(errors))
+        return cls(**sections, height=height, log_level=log_level, dev=dev)
+
+    def diff(self, other: "BarConfig") -> set[str]:
+        """Names of the fields that differ from `other`."""
+        return {
+            f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)
+        }
+
+
+CONFIG_PATH = load_args() or XDG_CONFIG_FILE
+app_config = load_config(CONFIG_PATH)
 
 if app_config is None:
     raise Exception("Config file missing")
 
-VINYL = app_config.get("vinyl", {"enable": False})
-BATTERY = app_config.get("battery", {"enable": False})
-WINDOW_TITLE = app_config.get("window_title", {"enable": True})
-STYLIX = app_config.get("stylix", {"enable": False})
-CALENDAR = app_config.get("calendar", {"enable": True, "khal_path": "khal"})
-NOTMUCH = app_config.get("notmuch", {"enable": True, "notmuch_path": "notmuch", "emacsclient_command": "emacsclient"})
-BAR_HEIGHT = app_config.get("height", 40)
-LOG_LEVEL = app_config.get("logLevel", "WARNING")
-DEV = app_config.get("dev", False)
+config = BarConfig.from_dict(app_config)
+
+
+def get_config() -> BarConfig:
+    """The running configuration, including reloads."""
+    return config
+
+
+def update_config(new: BarConfig) -> set[str]:
+    """Make `new` the running configuration and return the changed fields.
+
+    Section dicts are updated in place, so modules holding `VINYL`,
+    `BATTERY` and friends see the new values.
+    """
+    global config, BAR_HEIGHT, LOG_LEVEL, DEV
+    changed = config.diff(new)
+    kept = {}
+    for name in changed:
+        current = getattr(config, name)
+        if isinstance(current, dict):
+            current.clear()
+            current.update(getattr(new, name))
+            kept[name] = current
+    config = replace(new, **kept)
+    BAR_HEIGHT = config.height
+    LOG_LEVEL = config.log_level
+    DEV = config.dev
+    return changed
+
+
+VINYL = config.vinyl
+BATTERY = config.battery
+WINDOW_TITLE = config.window_title
+STYLIX = config.stylix
+CALENDAR = config.calendar
+NOTMUCH = config.notmuch
+WORKSPACES = config.workspaces
+PLAYER = config.player
+SYSTEM_STATS = config.system_stats
+ALBUM_PALETTE = config.album_palette
+WATCHDOG = config.watchdog
+STYLESHEET = config.stylesheet
+BAR_HEIGHT = config.height
+LOG_LEVEL = config.log_level
+DEV = config.dev
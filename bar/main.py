@@ -1,90 +1,288 @@
+# Imported first so every later phase is covered by --profile-startup
+from .utils.profiler import profiler
+# Installed before anything connects a signal or adds a source
+from .utils.callbacks import callback_stats
+
+callback_stats.install()
+
+import signal
+import sys
+
 from loguru import logger
 
 # Configure logging based on dev flag
-from .config import DEV, LOG_LEVEL
+with profiler.phase("config"):
+    from .config import DEV, LOG_LEVEL
 if DEV:
     # In dev mode, disable fabric logs but keep stylix and bar logs
     logger.disable("fabric")
 else:
     # In production, disable fabric logs but keep bar logs with configurable level
-    import sys
     logger.disable("fabric")
     logger.configure(handlers=[{"sink": sys.stderr, "level": LOG_LEVEL, "format": "{time} | {level} | {name}:{function}:{line} - {message}"}])
 
-from fabric import Application
-from fabric.i3 import I3, I3MessageType
-from fabric.system_tray.widgets import SystemTray
-from fabric.widgets.wayland import WaylandWindow as Window
-from fabric.utils import (
-    get_relative_path,
-)
-from .modules.bar import StatusBar
-from .modules.window_fuzzy import FuzzyWindowFinder
-from .modules.stylix import get_stylix_css_path
-from .config import STYLIX
-from .services.fenster import get_i3_connection
+# Last run's service state, read before any widget is built
+with profiler.phase("snapshot"):
+    from .services.snapshot import get_snapshot
+
+    snapshot = get_snapshot()
 
+with profiler.phase("imports: fabric/GTK"):
+    from fabric import Application
+    from fabric.i3 import I3, I3MessageType
+    from fabric.system_tray.widgets import SystemTray
+    from fabric.widgets.wayland import WaylandWindow as Window
+    from fabric.utils import (
+        get_relative_path,
+    )
+    from gi.repository import Gdk, GLib
+with profiler.phase("imports: bar modules"):
+    from .modules.bar import StatusBar
+    from .modules.window_fuzzy import FuzzyWindowFinder
+    from .modules.stylix import get_stylix_css_path
+    from .config import STYLESHEET, STYLIX, WATCHDOG
+    from .services.config import get_config_service
+    from .services.control import get_control_server
+    from .services.fenster import get_i3_connection
+    from .services.theme import get_theme_service
+    from .utils.stylesheet import get_bundled_stylesheet
+    from .utils.watchdog import start_watchdog, stop_watchdog
 
-tray = SystemTray(name="system-tray", spacing=4)
-i3 = get_i3_connection()
+
+with profiler.phase("SystemTray"):
+    tray = SystemTray(name="system-tray", spacing=4)
+with profiler.phase("i3 connection"):
+    i3 = get_i3_connection()
 
 dummy = Window(visible=False)
-finder = FuzzyWindowFinder()
+with profiler.phase("FuzzyWindowFinder"):
+    finder = FuzzyWindowFinder()
 
-bar_windows = []
+bars: dict[str, StatusBar] = {}
 notmuch_widget = None
+# Delay between an output change and resyncing the bars
+OUTPUT_SETTLE_MS = 250
+_resync_id = None
 
 app = Application("bar", dummy, finder)
 
-# Load CSS - use Stylix if enabled, otherwise use default
-if STYLIX.get("enable", False):
-    stylix_css_path = get_stylix_css_path()
-    if stylix_css_path:
-        logger.info("[Bar] Using Stylix CSS")
-        # Load base styles first for structure
-        app.set_stylesheet_from_file(get_relative_path("styles/main.css"))
-        # Then apply Stylix theme colors
-        app.set_stylesheet_from_file(stylix_css_path)
+
+def load_stylesheets():
+    # Load CSS - use Stylix if enabled, otherwise use default
+    # main.css and its imports are parsed as one cached bundle
+    main_css_path = get_bundled_stylesheet(
+        get_relative_path("styles/main.css"),
+        prune=STYLESHEET.get("prune", False),
+    )
+    if STYLIX.get("enable", False):
+        stylix_css_path = get_stylix_css_path()
+        if stylix_css_path:
+            logger.info("[Bar] Using Stylix CSS")
+            # Colors come from a separate provider that is swapped on theme changes
+            get_theme_service()
+            # Load base styles first for structure
+            app.set_stylesheet_from_file(main_css_path)
+            # Then apply the Stylix theme, which refers to the palette colors
+            app.set_stylesheet_from_file(stylix_css_path)
+        else:
+            logger.warning("[Bar] Stylix enabled but CSS generation failed, falling back to default")
+            app.set_stylesheet_from_file(main_css_path)
     else:
-        logger.warning("[Bar] Stylix enabled but CSS generation failed, falling back to default")
-        app.set_stylesheet_from_file(get_relative_path("styles/main.css"))
-else:
-    logger.info("[Bar] Using default CSS")
-    app.set_stylesheet_from_file(get_relative_path("styles/main.css"))
+        logger.info("[Bar] Using default CSS")
+        app.set_stylesheet_from_file(main_css_path)
 
 
-def spawn_bars():
+with profiler.phase("css"):
+    load_stylesheets()
+
+
+def _get_active_outputs() -> list[dict] | None:
+    outputs_reply = I3.send_command("", I3MessageType.GET_OUTPUTS)
+    if not (outputs_reply.is_ok and isinstance(outputs_reply.reply, list)):
+        logger.warning("[Bar] Failed to get outputs")
+        return None
+    return [o for o in outputs_reply.reply if o.get("active")]
+
+
+def _sync_bars(outputs: list[dict]):
+    """Match the bars to `outputs`, keeping those whose output stayed."""
     global notmuch_widget
+    names = [output.get("name", f"Unknown-{i}") for i, output in enumerate(outputs)]
+    primary = names[0] if names else None
+
+    for name in [name for name in bars if name not in names]:
+        logger.info(f"[Bar] Output {name} removed")
+        bar = bars.pop(name)
+        bar.set_tray(None)
+        bar.destroy()
+
+    # The tray follows the first output; release it before it is moved
+    for name, bar in bars.items():
+        if name != primary:
+            bar.set_tray(None)
+
+    for i, name in enumerate(names):
+        bar = bars.get(name)
+        if bar is None:
+            logger.info(f"[Bar] Output {name} added")
+            with profiler.phase(f"StatusBar {name}"):
+                bars[name] = StatusBar(
+                    display=name, tray=tray if name == primary else None, monitor=i
+                )
+            continue
+        bar.move_to_monitor(i)
+        if name == primary:
+            bar.set_tray(tray)
+
+    notmuch_widget = bars[primary].notmuch if primary else None
+
+
+def spawn_bars():
     logger.info("[Bar] Spawning bars")
-    outputs_reply = I3.send_command("", I3MessageType.GET_OUTPUTS)
+    # Connected first, so a failed or empty first query recovers on the next
+    # output change
+    i3.connect("event::output", _on_outputs_changed)
+    display = Gdk.Display.get_default()
+    display.connect("monitor-added", _on_outputs_changed)
+    display.connect("monitor-removed", _on_outputs_changed)
 
-    if not (outputs_reply.is_ok and isinstance(outputs_reply.reply, list)):
-        logger.warning("[Bar] Failed to get outputs — skipping bar spawn")
-        return
+    with profiler.phase("GET_OUTPUTS"):
+        outputs = _get_active_outputs()
+
+    if outputs is None:
+        logger.warning("[Bar] Retrying bar spawn shortly")
+        _on_outputs_changed()
+    else:
+        if not outputs:
+            logger.warning("[Bar] No active outputs found — waiting for one")
+        _sync_bars(outputs)
+
+    # Default-idle sources run after the redraw, so this follows the first frame
+    GLib.idle_add(_report_startup)
+    return False
+
+
+def _on_outputs_changed(*_):
+    # Output events come in bursts and GDK learns about monitors separately,
+    # so resync once both have settled
+    global _resync_id
+    if _resync_id is None:
+        _resync_id = GLib.timeout_add(OUTPUT_SETTLE_MS, _resync_bars)
+
+
+def _resync_bars():
+    global _resync_id
+    _resync_id = None
+    outputs = _get_active_outputs()
+    if outputs is not None:
+        _sync_bars(outputs)
+    return False
+
+
+def _report_startup():
+    profiler.report()
+    return False
+
+
+def _on_i3_ready():
+    profiler.end("fenster ready")
+    spawn_bars()
+
+
+def _on_config_changed(_, sections):
+    for bar in bars.values():
+        bar.apply_config(sections)
+    if "stylesheet" in sections:
+        load_stylesheets()
+    if "watchdog" in sections:
+        stop_watchdog()
+        _start_watchdog()
 
-    outputs = [o for o in outputs_reply.reply if o.get("active")]
 
-    if not outputs:
-        logger.warning("[Bar] No active outputs found — skipping bar spawn")
-        return
+def _start_watchdog():
+    if WATCHDOG.get("enable", False):
+        start_watchdog(stall_ms=WATCHDOG.get("stall_ms", 250))
+    return False
+
+
+def _focused_bar() -> StatusBar | None:
+    reply = I3.send_command("", I3MessageType.GET_OUTPUTS)
+    if reply.is_ok and isinstance(reply.reply, list):
+        for output in reply.reply:
+            if output.get("focused") and output.get("name") in bars:
+                return bars[output["name"]]
+    return next(iter(bars.values()), None)
+
+
+def _toggle(target: str):
+    bar = _focused_bar()
+    if bar is None:
+        raise RuntimeError("no bar is shown")
+    if target == "calendar":
+        if bar.calendar_popup is None:
+            raise RuntimeError("the calendar is disabled")
+        bar.toggle_calendar()
+    elif target == "quick-menu":
+        bar.quick_menu.toggle_menu()
+    else:
+        raise ValueError(f"unknown target '{target}', expected calendar or quick-menu")
+
 
-    for i, output in enumerate(outputs):
-        output_name = output.get("name", f"Unknown-{i}")
-        bar = StatusBar(display=output_name, tray=tray if i == 0 else None, monitor=i)
-        bar_windows.append(bar)
-        if i == 0 and bar.notmuch:
-            notmuch_widget = bar.notmuch
+def _reload_config():
+    return " ".join(sorted(get_config_service().reload())) or None
 
+
+def _report_callbacks(output_format: str = "table"):
+    if not callback_stats.enabled:
+        raise RuntimeError("start the bar with --profile-callbacks")
+    if output_format == "table":
+        return "\n" + callback_stats.table()
+    if output_format == "chrome":
+        return f"Chrome trace written to {callback_stats.write_chrome_trace()}"
+    if output_format == "reset":
+        callback_stats.reset()
+        return None
+    raise ValueError(f"unknown format '{output_format}', expected table, chrome or reset")
+
+
+def _start_control_server():
+    server = get_control_server()
+    server.register("finder", finder.show)
+    server.register("toggle", _toggle)
+    server.register("reload-css", load_stylesheets)
+    server.register("reload-config", _reload_config)
+    server.register("callbacks", _report_callbacks)
+    server.start()
+
+
+def _shutdown():
+    snapshot.save()
+    get_control_server().stop()
+    stop_watchdog()
+    app.quit()
     return False
 
 
 def main():
+    snapshot.start()
+    get_config_service().connect("changed", _on_config_changed)
+    _start_control_server()
+    # Started from the loop itself, so building the bars is not a "stall"
+    GLib.idle_add(_start_watchdog)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, _shutdown)
+
     if i3.ready:
         spawn_bars()
     else:
-        i3.connect("notify::ready", lambda *_: spawn_bars())
+        profiler.begin("fenster ready")
+        i3.connect("notify::ready", lambda *_: _on_i3_ready())
 
     app.run()
+    snapshot.save()
+    get_control_server().stop()
+    if callback_stats.enabled:
+        print(callback_stats.table(), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -1,24 +1,32 @@
-import psutil
 from fabric.widgets.box import Box
 from fabric.widgets.label import Label
 from fabric.widgets.image import Image
 from fabric.widgets.overlay import Overlay
 from fabric.widgets.datetime import DateTime
 from fabric.widgets.centerbox import CenterBox
-from bar.modules.player import Player
-from bar.modules.vinyl import VinylButton
 from bar.modules.quick_menu import QuickMenuOpener
-from bar.modules.battery import Battery
-from bar.modules.calendar import CalendarService, CalendarPopup
-from bar.modules.notmuch import NotmuchWidget
 from fabric.widgets.wayland import WaylandWindow as Window
 from fabric.system_tray.widgets import SystemTray
-from bar.widgets.fenster import FensterWorkspaces, FensterWorkspaceButton, FensterActiveWindow
+from bar.widgets.fenster import FensterWorkspaces, FensterWorkspacePills, FensterWorkspaceButton, FensterActiveWindow
 from bar.services.fenster import get_i3_connection
 from fabric.widgets.circularprogressbar import CircularProgressBar
-from bar.services.system_stats import SystemStatsService
+from bar.utils.frame import after_first_frame
 
-from bar.config import VINYL, BATTERY, BAR_HEIGHT, WINDOW_TITLE, NOTMUCH
+# Optional modules (Player, calendar, notmuch, vinyl, battery, system stats) are
+# imported where they are constructed, so disabled ones never pull in
+# Playerctl, khal or psutil at startup.
+from bar.config import (
+    VINYL,
+    BATTERY,
+    WINDOW_TITLE,
+    NOTMUCH,
+    WORKSPACES,
+    CALENDAR,
+    PLAYER,
+    SYSTEM_STATS,
+    ALBUM_PALETTE,
+    get_config,
+)
 
 
 class StatusBar(Window):
@@ -38,16 +46,14 @@ class StatusBar(Window):
             all_visible=False,
             monitor=monitor,
         )
+        self._display = display
+        self._monitor = monitor
 
-        self.workspaces = FensterWorkspaces(
-            output=display,
-            name="workspaces",
-            spacing=4,
-        )
-        # Create calendar components (refresh every 2 minutes)
-        self.calendar_service = CalendarService(update_interval=120000)
-        self.calendar_popup = CalendarPopup()
+        self.workspaces = self._build_workspaces()
+        self.calendar_service = None
+        self.calendar_popup = None
         self.calendar_popup_visible = False
+        self._build_calendar()
 
         # Create clickable datetime widget
         from fabric.widgets.button import Button
@@ -59,8 +65,6 @@ class StatusBar(Window):
             style="background: transparent; border: none; padding: 0; margin: 0; box-shadow: none;"
         )
 
-        # Connect calendar service to popup
-        self.calendar_service.connect("events-changed", self.update_calendar_display)
         self.system_tray = tray
 
         self.active_window = FensterActiveWindow(
@@ -83,35 +87,155 @@ class StatusBar(Window):
             child=self.ram_progress_bar,
             overlays=[self.cpu_progress_bar, self.progress_label],
         )
-        self.player = Player()
+        self.player = self._build_player()
         self.vinyl = None
+        self.quick_menu = self._build_quick_menu()
+        self._style_popups()
+        self.battery = self._build_battery()
+        self.notmuch = self._build_notmuch(initial_load=False)
+
+        self.status_container = Box(
+            name="widgets-container",
+            spacing=4,
+            orientation="h",
+            children=self.progress_bars_overlay,
+        )
+
+        self.start_container = Box(
+            name="start-container",
+            spacing=6,
+            orientation="h",
+            children=[
+                Image(name="nixos-label", icon_name="nix-snowflake-white", icon_size=20),
+                self.workspaces,
+            ],
+        )
+        self.center_container = Box(
+            name="center-container",
+            spacing=4,
+            orientation="h",
+        )
+        self.end_container = Box(
+            name="end-container",
+            spacing=4,
+            orientation="h",
+        )
+        self._update_center_children()
+        self._update_end_children()
+
+        self.children = CenterBox(
+            name="bar-inner",
+            start_children=self.start_container,
+            center_children=self.center_container,
+            end_children=self.end_container,
+        )
+
+        self.system_stats_service = self._build_system_stats()
+
+        # Set the bar height
+        self.set_size_request(-1, get_config().height)
+
+        self.connect("destroy", self._on_destroy)
+
+        self.show_all()
+        # Data loads start once the bar is on screen, concurrently and off the
+        # main thread, so khal and notmuch never delay the first frame
+        after_first_frame(self, self._load_initial_data)
+
+    def _build_workspaces(self):
+        if WORKSPACES.get("animation") == "drawn":
+            # Pills drawn in place; switching never resizes the bar
+            return FensterWorkspacePills(
+                output=self._display,
+                name="workspaces",
+                pill_width=WORKSPACES.get("pill_width", 16),
+                active_pill_width=WORKSPACES.get("active_pill_width", 64),
+            )
+        return FensterWorkspaces(
+            output=self._display,
+            name="workspaces",
+            spacing=4,
+        )
+
+    def _build_calendar(self):
+        if not CALENDAR.get("enable", True):
+            return
+        from bar.modules.calendar import CalendarService, CalendarPopup
+
+        # Create calendar components (refresh every 2 minutes)
+        self.calendar_service = CalendarService(
+            update_interval=120000, initial_load=False
+        )
+        self.calendar_popup = CalendarPopup()
+        # Connect calendar service to popup
+        self.calendar_service.connect("events-changed", self.update_calendar_display)
+
+    def _style_popups(self):
+        # With drawn workspaces the popups fade in place as well; the default
+        # slide-down animates their margin, resizing the surface every frame
+        fade = WORKSPACES.get("animation") == "drawn"
+        for popup in (self.calendar_popup, self.quick_menu.get_menu()):
+            if popup is None:
+                continue
+            if fade:
+                popup.add_style_class("fade-in")
+            else:
+                popup.remove_style_class("fade-in")
+
+    def _build_player(self):
+        if not PLAYER.get("enable", True):
+            return None
+        from bar.modules.player import Player
+
+        return Player()
+
+    def _build_quick_menu(self):
         if VINYL["enable"]:
+            from bar.modules.vinyl import VinylButton
+
             self.vinyl = VinylButton()
 
         # Create quick menu button
-        self.quick_menu = QuickMenuOpener(icon_name="open-menu-symbolic")
+        quick_menu = QuickMenuOpener(icon_name="open-menu-symbolic")
         # Setup audio section with vinyl if enabled
         if self.vinyl:
-            self.quick_menu.get_menu().setup_audio_section(vinyl_service=self.vinyl)
+            quick_menu.get_menu().setup_audio_section(vinyl_service=self.vinyl)
+        return quick_menu
 
-        self.battery = None
-        if BATTERY["enable"]:
-            self.battery = Battery()
+    def _build_battery(self):
+        if not BATTERY["enable"]:
+            return None
+        from bar.modules.battery import Battery
 
-        self.notmuch = None
-        if NOTMUCH["enable"]:
-            self.notmuch = NotmuchWidget()
+        return Battery()
 
-        self.status_container = Box(
-            name="widgets-container",
-            spacing=4,
-            orientation="h",
-            children=self.progress_bars_overlay,
+    def _build_notmuch(self, initial_load=True):
+        if not NOTMUCH["enable"]:
+            return None
+        from bar.modules.notmuch import NotmuchWidget
+
+        return NotmuchWidget(initial_load=initial_load)
+
+    def _build_system_stats(self):
+        if not SYSTEM_STATS.get("enable", True):
+            return None
+        from bar.services.system_stats import SystemStatsService
+
+        # Create system stats service with signal-based updates
+        service = SystemStatsService(update_interval=3000)
+        service.connect("stats-changed", self.update_progress_bars)
+        return service
+
+    def _update_center_children(self):
+        self.center_container.children = (
+            [self.active_window] if WINDOW_TITLE["enable"] else []
         )
 
+    def _update_end_children(self):
         end_container_children = []
 
-        end_container_children.append(self.status_container)
+        if SYSTEM_STATS.get("enable", True):
+            end_container_children.append(self.status_container)
         if self.system_tray:
             end_container_children.append(self.system_tray)
 
@@ -124,49 +248,115 @@ class StatusBar(Window):
         # Add quick menu button next to time
         end_container_children.append(self.quick_menu)
         end_container_children.append(self.date_time)
+        self.end_container.children = end_container_children
 
-        center_children = []
-        if WINDOW_TITLE["enable"]:
-            center_children.append(self.active_window)
+    def apply_config(self, sections: set[str]):
+        """Rebuild only what the changed top-level config `sections` affect."""
+        from loguru import logger
 
-        self.children = CenterBox(
-            name="bar-inner",
-            start_children=Box(
-                name="start-container",
-                spacing=6,
-                orientation="h",
-                children=[
-                    Image(name="nixos-label", icon_name="nix-snowflake-white", icon_size=20),
-                    self.workspaces,
-                ],
-            ),
-            center_children=Box(
-                name="center-container",
-                spacing=4,
-                orientation="h",
-                children=center_children,
-            ),
-            end_children=Box(
-                name="end-container",
-                spacing=4,
-                orientation="h",
-                children=end_container_children,
-            ),
-        )
+        if "workspaces" in sections:
+            self.workspaces.destroy()
+            self.workspaces = self._build_workspaces()
+            self.start_container.add(self.workspaces)
+            self.workspaces.show_all()
 
-        # Create system stats service with signal-based updates
-        self.system_stats_service = SystemStatsService(update_interval=3000)
-        self.system_stats_service.connect("stats-changed", self.update_progress_bars)
+        if "calendar" in sections:
+            if self.calendar_service:
+                self.calendar_service.stop_monitoring()
+                self.calendar_popup.destroy()
+            self.calendar_service = None
+            self.calendar_popup = None
+            self.calendar_popup_visible = False
+            self._build_calendar()
+            if self.calendar_service:
+                self.calendar_service.update_events_async()
 
-        # Set the bar height
-        self.set_size_request(-1, BAR_HEIGHT)
+        if "player" in sections:
+            if self.player:
+                self.player.destroy()
+            self.player = self._build_player()
 
-        self.show_all()
+        if "vinyl" in sections:
+            self.quick_menu.get_menu().destroy()
+            self.quick_menu.destroy()
+            if self.vinyl:
+                self.vinyl.destroy()
+            self.vinyl = None
+            self.quick_menu = self._build_quick_menu()
+            self.quick_menu.show_all()
+
+        if sections & {"workspaces", "calendar", "vinyl"}:
+            self._style_popups()
+
+        if "battery" in sections:
+            if self.battery:
+                self.battery.battery_service.stop_monitoring()
+                self.battery.destroy()
+            self.battery = self._build_battery()
+
+        if "notmuch" in sections:
+            if self.notmuch:
+                self.notmuch.service.stop_monitoring()
+                self.notmuch.destroy()
+            self.notmuch = self._build_notmuch()
+
+        if "system_stats" in sections:
+            if self.system_stats_service:
+                self.system_stats_service.stop_monitoring()
+            self.system_stats_service = self._build_system_stats()
+
+        if "album_palette" in sections and not ALBUM_PALETTE.get("enable", False):
+            from bar.services.palette import get_palette_service
 
-    def __del__(self):
-        """Cleanup when bar is destroyed"""
-        if hasattr(self, 'calendar_service'):
+            get_palette_service().clear()
+
+        if "window_title" in sections:
+            self._update_center_children()
+        if sections & {"vinyl", "battery", "notmuch", "system_stats"}:
+            self._update_end_children()
+            for widget in (self.battery, self.notmuch):
+                if widget:
+                    widget.show_all()
+        if "height" in sections:
+            self.set_size_request(-1, get_config().height)
+
+        restart = sections & {"log_level", "dev"}
+        if restart:
+            logger.info(f"[Bar] {', '.join(sorted(restart))} changed, takes effect after a restart")
+
+    def _load_initial_data(self):
+        if self.calendar_service:
+            self.calendar_service.update_events_async()
+        if self.notmuch:
+            self.notmuch.service.update_unread_count_async()
+
+    def _on_destroy(self, *_):
+        """Stop this bar's timers when its output goes away"""
+        if self.calendar_service:
             self.calendar_service.stop_monitoring()
+            self.calendar_popup.destroy()
+        if self.notmuch:
+            self.notmuch.service.stop_monitoring()
+        if self.battery:
+            self.battery.battery_service.stop_monitoring()
+        if self.system_stats_service:
+            self.system_stats_service.stop_monitoring()
+        self.quick_menu.get_menu().destroy()
+
+    def move_to_monitor(self, monitor: int):
+        """Follow the output to its new monitor index after a hot-plug."""
+        if monitor != self._monitor:
+            self._monitor = monitor
+            self.monitor = monitor
+
+    def set_tray(self, tray: SystemTray | None):
+        """Move the shared system tray into (or out of) this bar."""
+        if tray is self.system_tray:
+            return
+        self.system_tray = tray
+        self._update_end_children()
+        if tray:
+            tray.show_all()
 
     def update_progress_bars(self, service, cpu_percent, memory_percent):
         """Update progress bars when system stats change"""
@@ -176,6 +366,8 @@ class StatusBar(Window):
     def toggle_calendar(self, button=None):
         """Toggle the calendar popup when datetime is clicked"""
         from loguru import logger
+        if self.calendar_popup is None:
+            return
         logger.info(f"[Calendar] DateTime clicked, popup_visible: {self.calendar_popup_visible}")
 
         if self.calendar_popup_visible:
@@ -185,9 +377,12 @@ class StatusBar(Window):
         else:
             logger.info("[Calendar] Showing calendar popup")
             # Use cached events - no need to refresh on click
-            cached_events = self.calendar_service.get_cached_events()
-            logger.info(f"[Calendar] Using {len(cached_events)} cached events")
-            self.calendar_popup.update_events_display(cached_events)
+            if self.calendar_service.loaded:
+                cached_events = self.calendar_service.get_cached_events()
+                logger.info(f"[Calendar] Using {len(cached_events)} cached events")
+                self.calendar_popup.update_events_display(cached_events)
+            else:
+                self.calendar_popup.show_loading()
             self.calendar_popup.set_visible(True)
             self.calendar_popup.show_all()
             self.calendar_popup_visible = True
@@ -2,6 +2,7 @@ import json
 import os
 import subprocess
 import shutil
+import threading
 from datetime import datetime, date
 
 # Add common binary paths to PATH for user binaries
@@ -11,8 +12,10 @@ from fabric.widgets.label import Label
 from fabric.widgets.button import Button
 from fabric.widgets.image import Image
 from fabric.widgets.wayland import WaylandWindow as Window
+from gi.repository import GLib
 from loguru import logger
 from bar.config import CALENDAR
+from bar.services.snapshot import get_snapshot
 
 # Try to import khal as a Python library
 try:
@@ -27,16 +30,31 @@ except ImportError:
 
 
 class CalendarService:
-    def __init__(self, update_interval=300000):  # 5 minutes default
-        self.events = []
+    def __init__(self, update_interval=300000, initial_load=True):  # 5 minutes default
+        # Today's events from the previous run, until the first fetch lands
+        saved = get_snapshot().get("calendar", {})
+        if saved.get("date") == date.today().isoformat():
+            self.events = saved.get("events", [])
+        else:
+            self.events = []
+        self.loaded = bool(self.events)
         self.callbacks = []
         self._update_interval = update_interval
         self._timer_id = None
+        self._loading = False
 
-        # Initial load
-        self.update_events()
+        # Initial load, off the main thread. Owners that pass initial_load=False
+        # call update_events_async themselves, e.g. after their first frame.
+        if initial_load:
+            self.update_events_async()
         # Start periodic updates
         self.start_monitoring()
+        get_snapshot().register("calendar", self._snapshot_state)
+
+    def _snapshot_state(self):
+        if not self.loaded:
+            return get_snapshot().get("calendar", {})
+        return {"date": date.today().isoformat(), "events": self.events}
 
     def connect(self, signal_name, callback):
         """Simple callback system to replace signals"""
@@ -44,10 +62,32 @@ class CalendarService:
             self.callbacks.append(callback)
 
     def emit_events_changed(self, events):
-        """Emit events changed to all callbacks"""
+        """Emit events changed to all callbacks, always on the main loop"""
+        if threading.current_thread() is not threading.main_thread():
+            GLib.idle_add(self._emit_events_changed_idle, events)
+            return
+        self.loaded = True
         for callback in self.callbacks:
             callback(self, events)
 
+    def _emit_events_changed_idle(self, events):
+        self.emit_events_changed(events)
+        return False
+
+    def update_events_async(self):
+        """Fetch today's events on a worker thread; callbacks run on the main loop"""
+        if self._loading:
+            return
+        self._loading = True
+        GLib.Thread.new("calendar-events", self._update_events_thread, None)
+
+    def _update_events_thread(self, *_):
+        try:
+            self.update_events()
+        finally:
+            self._loading = False
+        return None
+
     def start_monitoring(self):
         """Start periodic event updates"""
         if self._timer_id is None:
@@ -63,16 +103,15 @@ class CalendarService:
     def stop_monitoring(self):
         """Stop periodic event updates"""
         if self._timer_id is not None:
-            from gi.repository import GLib
-
             GLib.source_remove(self._timer_id)
             self._timer_id = None
             logger.info("[Calendar] Stopped periodic updates")
+        get_snapshot().unregister("calendar", self._snapshot_state)
 
     def _periodic_update(self):
         """Periodic update callback"""
         logger.info("[Calendar] Performing periodic events update")
-        self.update_events()
+        self.update_events_async()
         return True  # Keep the timer running
 
     def get_cached_events(self):
@@ -224,7 +263,6 @@ class CalendarPopup(Window):
             name="events-box",
             orientation="v",
             spacing=6,
-            style="min-width: 450px; min-height: 200px;",
         )
 
         # Add a test label to make sure popup is working
@@ -239,6 +277,10 @@ class CalendarPopup(Window):
         # Set explicit size - much bigger
         self.set_size_request(500, 400)
 
+    def show_loading(self):
+        """Placeholder until the first events load finishes"""
+        self.events_box.children = [Label("Loading events…", name="no-events")]
+
     def update_events_display(self, events):
         """Update the events display"""
         logger.info(f"[Calendar] Updating popup with {len(events)} events")
@@ -292,7 +334,6 @@ class CalendarPopup(Window):
                 time_display,
                 name="event-time",
                 style_classes=["event-time"],
-                style="min-width: 100px;"  # Fixed width for consistent alignment
             )
 
             # Right side: Content (title and location)
@@ -347,7 +388,6 @@ class CalendarPopup(Window):
             current_time,
             name="current-time-label",
             style_classes=["current-time-label"],
-            style="min-width: 100px; font-weight: bold;"
         )
 
         # Line indicator
@@ -395,7 +435,7 @@ class CalendarWidget(Button):
         else:
             logger.info("[Calendar] Showing popup")
             # Refresh events when opening
-            self.service.update_events()
+            self.service.update_events_async()
             self.popup.set_visible(True)
             self.popup.show_all()
             self.popup_visible = True
@@ -0,0 +1,192 @@
+"""
+Audio spectrum visualizer.
+
+PCM is read from the default sink's monitor (PipeWire through its PulseAudio
+interface) on a worker thread and turned into log-spaced frequency bands with
+NumPy, several windowed FFT frames per read. Drawing is driven by the frame
+clock and fills a single cairo path per frame. Capture only runs while audio
+is playing and the widget is mapped.
+"""
+
+import subprocess
+import threading
+
+import cairo
+from gi.repository import Gtk
+from fabric.widgets.box import Box
+from loguru import logger
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.info("[Cavalcade] numpy not available, spectrum visualizer disabled")
+
+
+SAMPLE_RATE = 44100
+FFT_SIZE = 2048
+HOP_SIZE = 512
+BATCH_HOPS = 4  # FFT frames computed per read from the capture pipe
+BAR_COUNT = 24
+MIN_FREQ = 50
+MAX_FREQ = 12000
+FLOOR_DB = -70.0
+DECAY = 0.8  # Fraction of the previous level kept per batch when falling
+
+CAPTURE_COMMAND = [
+    "parec",
+    "--device=@DEFAULT_MONITOR@",
+    "--format=s16le",
+    f"--rate={SAMPLE_RATE}",
+    "--channels=1",
+    "--raw",
+    "--latency-msec=20",
+]
+
+
+class SpectrumAnalyzer:
+    """Turns batches of mono samples into smoothed band levels in [0, 1]."""
+
+    def __init__(self, bands: int = BAR_COUNT):
+        self._window = np.hanning(FFT_SIZE).astype(np.float32)
+        # Scale so a full-scale sine reads 0 dB
+        self._scale = 2.0 / self._window.sum()
+        freqs = np.fft.rfftfreq(FFT_SIZE, 1 / SAMPLE_RATE)
+        edges = np.searchsorted(freqs, np.geomspace(MIN_FREQ, MAX_FREQ, bands + 1))
+        # Every band needs at least one bin; low bands are narrower than a bin
+        steps = np.arange(bands + 1)
+        self._edges = np.maximum.accumulate(edges - steps) + steps
+        self._widths = np.diff(self._edges)
+        self._history = np.zeros(FFT_SIZE - HOP_SIZE, dtype=np.float32)
+        self._levels = np.zeros(bands, dtype=np.float32)
+
+    def process(self, chunk: bytes) -> "np.ndarray":
+        samples = np.frombuffer(chunk, dtype="<i2").astype(np.float32) / 32768.0
+        signal = np.concatenate((self._history, samples))
+        self._history = signal[-(FFT_SIZE - HOP_SIZE) :]
+
+        frames = sliding_window_view(signal, FFT_SIZE)[::HOP_SIZE]
+        spectrum = np.abs(np.fft.rfft(frames * self._window, axis=1)).mean(axis=0)
+        spectrum *= self._scale
+
+        cumulative = np.concatenate(([0.0], np.cumsum(spectrum)))
+        bands = (cumulative[self._edges[1:]] - cumulative[self._edges[:-1]]) / self._widths
+        db = 20 * np.log10(bands + 1e-9)
+        levels = np.clip(1 - db / FLOOR_DB, 0.0, 1.0).astype(np.float32)
+
+        self._levels = np.maximum(levels, self._levels * DECAY)
+        return self._levels
+
+
+class SpectrumRender:
+    """Owns the capture thread and the drawing area of the visualizer."""
+
+    def __init__(self, bar_count: int = BAR_COUNT, bar_spacing: int = 2):
+        self._bar_count = bar_count
+        self._bar_spacing = bar_spacing
+        self._levels = None
+        self._fresh = False
+        self._playing = False
+        self._process: subprocess.Popen | None = None
+        self._thread: threading.Thread | None = None
+        self._tick_id = None
+
+        self.drawing_area = Gtk.DrawingArea(name="cavalcade")
+        self.drawing_area.set_size_request(bar_count * 4, 16)
+        self.drawing_area.connect("draw", self._on_draw)
+        self.drawing_area.connect("map", lambda *_: self._update_capture())
+        self.drawing_area.connect("unmap", lambda *_: self._update_capture())
+        self._box = Box(name="cavalcade-box", children=[self.drawing_area])
+
+    def get_spectrum_box(self) -> Box:
+        return self._box
+
+    def set_playing(self, playing: bool):
+        """Capture only runs while something is playing."""
+        self._playing = playing
+        self._update_capture()
+
+    def _update_capture(self):
+        if self._playing and self.drawing_area.get_mapped():
+            self._start()
+        else:
+            self._stop()
+
+    def _start(self):
+        if self._process is not None:
+            return
+        try:
+            self._process = subprocess.Popen(
+                CAPTURE_COMMAND,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logger.warning(f"[Cavalcade] Failed to start capture: {e}")
+            return
+        self._thread = threading.Thread(
+            target=self._capture, args=(self._process,), name="cavalcade", daemon=True
+        )
+        self._thread.start()
+        self._tick_id = self.drawing_area.add_tick_callback(self._on_tick)
+        logger.info("[Cavalcade] Capture started")
+
+    def _stop(self):
+        if self._process is None:
+            return
+        self._process.terminate()
+        self._process = None
+        self._thread = None
+        if self._tick_id:
+            self.drawing_area.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+        self._levels = None
+        self.drawing_area.queue_draw()
+        logger.info("[Cavalcade] Capture stopped")
+
+    def _capture(self, process: subprocess.Popen):
+        analyzer = SpectrumAnalyzer(self._bar_count)
+        chunk_size = HOP_SIZE * BATCH_HOPS * 2  # s16 mono
+        while process is self._process:
+            chunk = process.stdout.read(chunk_size)
+            if not chunk or len(chunk) < chunk_size:
+                break
+            levels = analyzer.process(chunk).copy()
+            if process is not self._process:
+                break
+            # A single reference swap; the main thread only ever reads it
+            self._levels = levels
+            self._fresh = True
+        process.stdout.close()
+        process.wait()
+
+    def _on_tick(self, widget, frame_clock):
+        if self._fresh:
+            self._fresh = False
+            widget.queue_draw()
+        return True
+
+    def _on_draw(self, widget: Gtk.DrawingArea, ctx: cairo.Context):
+        levels = self._levels
+        if levels is None:
+            return
+        width = widget.get_allocated_width()
+        height = widget.get_allocated_height()
+        bar_width = (width - self._bar_spacing * (len(levels) - 1)) / len(levels)
+        if bar_width <= 0:
+            return
+
+        color = widget.get_style_context().get_color(Gtk.StateFlags.NORMAL)
+        ctx.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        for i, level in enumerate(levels.tolist()):
+            bar_height = max(1.0, level * height)
+            ctx.rectangle(
+                i * (bar_width + self._bar_spacing),
+                height - bar_height,
+                bar_width,
+                bar_height,
+            )
+        ctx.fill()
@@ -1,6 +1,7 @@
 import os
 import subprocess
 import shutil
+import threading
 
 # Add common binary paths to PATH for user binaries
 os.environ['PATH'] = '/run/current-system/sw/bin:/home/' + os.environ.get('USER', 'user') + '/.nix-profile/bin:' + os.environ.get('PATH', '')
@@ -8,21 +9,31 @@ from fabric.widgets.box import Box
 from fabric.widgets.label import Label
 from fabric.widgets.button import Button
 from fabric.widgets.image import Image
+from gi.repository import GLib
 from loguru import logger
 from bar.config import NOTMUCH
+from bar.services.snapshot import get_snapshot
 
 
 class NotmuchService:
-    def __init__(self, update_interval=60000):  # 1 minute default
-        self.unread_count = 0
+    def __init__(self, update_interval=60000, initial_load=True):  # 1 minute default
+        # Count from the previous run, until the first fetch lands
+        self.unread_count = get_snapshot().get("notmuch", {}).get("unread", 0)
         self.callbacks = []
         self._update_interval = update_interval
         self._timer_id = None
+        self._loading = False
 
-        # Initial load
-        self.update_unread_count()
+        # Initial load, off the main thread. Owners that pass initial_load=False
+        # call update_unread_count_async themselves, e.g. after their first frame.
+        if initial_load:
+            self.update_unread_count_async()
         # Start periodic updates
         self.start_monitoring()
+        get_snapshot().register("notmuch", self._snapshot_state)
+
+    def _snapshot_state(self):
+        return {"unread": self.unread_count}
 
     def connect(self, signal_name, callback):
         """Simple callback system to replace signals"""
@@ -30,10 +41,31 @@ class NotmuchService:
             self.callbacks.append(callback)
 
     def emit_unread_changed(self, count):
-        """Emit unread changed to all callbacks"""
+        """Emit unread changed to all callbacks, always on the main loop"""
+        if threading.current_thread() is not threading.main_thread():
+            GLib.idle_add(self._emit_unread_changed_idle, count)
+            return
         for callback in self.callbacks:
             callback(self, count)
 
+    def _emit_unread_changed_idle(self, count):
+        self.emit_unread_changed(count)
+        return False
+
+    def update_unread_count_async(self):
+        """Fetch the unread count on a worker thread; callbacks run on the main loop"""
+        if self._loading:
+            return
+        self._loading = True
+        GLib.Thread.new("notmuch-count", self._update_unread_count_thread, None)
+
+    def _update_unread_count_thread(self, *_):
+        try:
+            self.update_unread_count()
+        finally:
+            self._loading = False
+        return None
+
     def start_monitoring(self):
         """Start periodic unread count updates"""
         if self._timer_id is None:
@@ -49,16 +81,15 @@ class NotmuchService:
     def stop_monitoring(self):
         """Stop periodic unread count updates"""
         if self._timer_id is not None:
-            from gi.repository import GLib
-
             GLib.source_remove(self._timer_id)
             self._timer_id = None
             logger.info("[Notmuch] Stopped periodic updates")
+        get_snapshot().unregister("notmuch", self._snapshot_state)
 
     def _periodic_update(self):
         """Periodic update callback"""
         logger.info("[Notmuch] Performing periodic unread count update")
-        self.update_unread_count()
+        self.update_unread_count_async()
         return True  # Keep the timer running
 
     def get_cached_count(self):
@@ -120,7 +151,7 @@ class NotmuchService:
 
 
 class NotmuchWidget(Button):
-    def __init__(self, **kwargs):
+    def __init__(self, initial_load=True, **kwargs):
         # Create the widget content
         self.icon = Image(icon_name="mail-unread-symbolic", icon_size=16)
         self.label = Label("0", name="unread-count")
@@ -140,7 +171,7 @@ class NotmuchWidget(Button):
         )
 
         # Initialize the service
-        self.service = NotmuchService()
+        self.service = NotmuchService(initial_load=initial_load)
         self.service.connect("unread-changed", self.update_display)
 
         logger.info("[Notmuch] Notmuch widget initialized")
@@ -1,21 +1,30 @@
+import math
 import os
 import urllib.parse
-import urllib.request
-import tempfile
-from gi.repository import Gtk, GLib, Gio, Gdk
+from collections import OrderedDict
+from gi.repository import Gtk, GLib, Gdk
 from fabric.widgets.box import Box
 from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.label import Label
 from fabric.widgets.button import Button
 from fabric.widgets.circularprogressbar import CircularProgressBar
+from fabric.widgets.eventbox import EventBox
 from fabric.widgets.overlay import Overlay
 from fabric.widgets.stack import Stack
 from ..widgets.circle_image import CircleImage
 import bar.modules.icons as icons
-from bar.services.mpris import MprisPlayerManager, MprisPlayer
+from bar.services.mpris import MprisPlayerManager, MprisPlayer, Playerctl
+from bar.services.artwork import get_artwork_cache
+from bar.services.wallpaper import get_wallpaper_service
+from bar.services.snapshot import get_snapshot
+from bar.config import ALBUM_PALETTE
 from fabric import Fabricator
 
-# from bar.modules.cavalcade import SpectrumRender
+# The palette service and the spectrum visualizer (both NumPy) are imported
+# where they are used, so a player without them never loads NumPy.
+
+# Player boxes kept alive by `Player`; further players reuse these.
+MAX_PLAYER_BOXES = 3
 
 
 def get_player_progress(fabricator, mpris_player):
@@ -66,12 +75,16 @@ class PlayerBox(Box):
         super().__init__(
             orientation="v", h_align="fill", spacing=0, h_expand=False, v_expand=True
         )
-        self.mpris_player = mpris_player
-        self._progress_timer_id = None  # Initialize timer ID
+        self.mpris_player = None
+        self._changed_handler = None
+        self._update_pending = False
+        self._art_url = None
+        self._cover_art = None  # (arturl, pixbuf) currently on the cover
+        self._progress_tick_id = None
+        self._shown_seconds = None
 
         self.cover = CircleImage(
             name="player-cover",
-            image_file=os.path.expanduser("~/Pictures/wallpaper/background.jpg"),
             size=162,
             h_align="center",
             v_align="center",
@@ -112,16 +125,22 @@ class PlayerBox(Box):
             end_angle=360,
         )
         self.time = Label(name="player-time", label="--:-- / --:--")
+        # Transparent input layer over the ring so the progress can be dragged
+        self.seek_area = EventBox(
+            events=["button-press", "button-release", "pointer-motion"],
+        )
+        self.seek_area.set_visible_window(False)
+        self.seek_area.connect("button-press-event", self._on_seek_press)
+        self.seek_area.connect("motion-notify-event", self._on_seek_motion)
+        self.seek_area.connect("button-release-event", self._on_seek_release)
+        self._scrubbing = False
         self.overlay = Overlay(
             child=self.cover_placerholder,
-            overlays=[self.progressbar, self.cover],
+            overlays=[self.progressbar, self.cover, self.seek_area],
         )
         self.overlay_container = CenterBox(
             name="player-overlay", center_children=[self.overlay]
         )
-        self.title.set_label("Nothing Playing")
-        self.album.set_label("Enjoy the silence")
-        self.artist.set_label("¯\\_(ツ)_/¯")
         self.progressbar.set_value(0.0)
         self.prev = Button(
             name="player-btn",
@@ -182,15 +201,45 @@ class PlayerBox(Box):
             ],
         )
         self.add(self.player_box)
+        self._showing_wallpaper = False
+        self._wallpaper_handler = get_wallpaper_service().connect(
+            "changed", self.on_wallpaper_changed
+        )
+        self.connect("destroy", self._on_destroy)
+        self.prev.connect("clicked", self._on_prev_clicked)
+        self.play_pause.connect("clicked", self._on_play_pause_clicked)
+        self.backward.connect("clicked", self._on_backward_clicked)
+        self.forward.connect("clicked", self._on_forward_clicked)
+        self.next.connect("clicked", self._on_next_clicked)
+        self.bind(mpris_player)
+
+    def bind(self, mpris_player):
+        """Show `mpris_player` (or nothing) in this box, reusing its widgets."""
+        if self._changed_handler:
+            self.mpris_player.disconnect(self._changed_handler)
+            self._changed_handler = None
+        self._stop_progress_ticks()
+        self.mpris_player = mpris_player
+        # Keep a cover that is already shown, e.g. restored from the snapshot
+        if not (mpris_player and mpris_player.arturl == self._art_url):
+            self._art_url = None
+        # The previous player's time must not linger until a position arrives
+        self._shown_seconds = None
+        self.time.set_text("--:-- / --:--")
+
         if mpris_player:
-            self._apply_mpris_properties()  # This will handle starting the timer if needed
-            self.prev.connect("clicked", self._on_prev_clicked)
-            self.play_pause.connect("clicked", self._on_play_pause_clicked)
-            self.backward.connect("clicked", self._on_backward_clicked)
-            self.forward.connect("clicked", self._on_forward_clicked)
-            self.next.connect("clicked", self._on_next_clicked)
-            self.mpris_player.connect("changed", self._on_mpris_changed)
+            self._apply_mpris_properties()  # This will handle starting ticks if needed
+            self._changed_handler = mpris_player.connect(
+                "changed", self._on_mpris_changed
+            )
         else:
+            for label, text in (
+                (self.title, "Nothing Playing"),
+                (self.album, "Enjoy the silence"),
+                (self.artist, "¯\\_(ツ)_/¯"),
+            ):
+                label.set_text(text)
+                label.set_visible(True)
             self.play_pause.get_child().set_markup(icons.stop)
             # Ensure buttons are disabled visually if no player
             self.backward.add_style_class("disabled")
@@ -199,36 +248,22 @@ class PlayerBox(Box):
             self.next.add_style_class("disabled")
             self.progressbar.set_value(0.0)
             self.time.set_text("--:-- / --:--")
+            if not self._showing_wallpaper:
+                self._show_wallpaper()
+
+    def _on_destroy(self, *_):
+        get_wallpaper_service().disconnect(self._wallpaper_handler)
 
     def _apply_mpris_properties(self):
         mp = self.mpris_player
-        self.title.set_visible(bool(mp.title and mp.title.strip()))
-        if mp.title and mp.title.strip():
-            self.title.set_text(mp.title)
-        self.album.set_visible(bool(mp.album and mp.album.strip()))
-        if mp.album and mp.album.strip():
-            self.album.set_text(mp.album)
-        self.artist.set_visible(bool(mp.artist and mp.artist.strip()))
-        if mp.artist and mp.artist.strip():
-            self.artist.set_text(mp.artist)
-        if mp.arturl:
-            parsed = urllib.parse.urlparse(mp.arturl)
-            if parsed.scheme == "file":
-                local_arturl = urllib.parse.unquote(parsed.path)
-                self._set_cover_image(local_arturl)
-            elif parsed.scheme in ("http", "https"):
-                GLib.Thread.new(
-                    "download-artwork", self._download_and_set_artwork, mp.arturl
-                )
-            else:
-                self._set_cover_image(mp.arturl)
-        else:
-            fallback = os.path.expanduser("~/Pictures/wallpaper/background.jpg")
-            self._set_cover_image(fallback)
-            file_obj = Gio.File.new_for_path(fallback)
-            monitor = file_obj.monitor_file(Gio.FileMonitorFlags.NONE, None)
-            monitor.connect("changed", self.on_wallpaper_changed)
-            self._wallpaper_monitor = monitor
+        track = mp.metadata
+        self._set_track_labels(track.title, track.album, track.artist)
+        if track.art_url:
+            if track.art_url != self._art_url:
+                self._load_artwork(track.art_url)
+        elif not self._showing_wallpaper:
+            self._art_url = None
+            self._show_wallpaper()
         self.update_play_pause_icon()
         # Keep progress bar and time visible always
         self.progressbar.set_visible(True)
@@ -247,18 +282,17 @@ class PlayerBox(Box):
             self.forward.add_style_class("disabled")
             self.progressbar.set_value(0.0)
             self.time.set_text("--:-- / --:--")
-            # Stop the timer if it's running
-            if self._progress_timer_id:
-                GLib.source_remove(self._progress_timer_id)
-                self._progress_timer_id = None
+            self._shown_seconds = None
+            self._stop_progress_ticks()
         else:
             # Enable seeking buttons
             self.backward.remove_style_class("disabled")
             self.forward.remove_style_class("disabled")
-            # Start the timer if it's not already running
-            if not self._progress_timer_id:
-                self._progress_timer_id = GLib.timeout_add(1000, self._update_progress)
-            # Initial progress update if possible
+            # The position is interpolated locally, so only tick while playing
+            if mp.playback_status == "playing":
+                self._start_progress_ticks()
+            else:
+                self._stop_progress_ticks()
             self._update_progress()  # Call once for immediate update
 
         # Enable/disable prev/next based on capabilities
@@ -272,35 +306,116 @@ class PlayerBox(Box):
         else:
             self.next.add_style_class("disabled")
 
-    def _set_cover_image(self, image_path):
+    def _set_track_labels(self, title: str, album: str, artist: str):
+        for label, text in (
+            (self.title, title.strip()),
+            (self.album, album.strip()),
+            (self.artist, artist.strip()),
+        ):
+            label.set_visible(bool(text))
+            if text:
+                label.set_text(text)
+
+    def _load_artwork(self, arturl):
+        self._art_url = arturl
+        self._showing_wallpaper = False
+        parsed = urllib.parse.urlparse(arturl)
+        if parsed.scheme == "file":
+            local_arturl = urllib.parse.unquote(parsed.path)
+            self._set_cover_image(local_arturl, arturl)
+        elif parsed.scheme in ("http", "https"):
+            self._set_remote_artwork(arturl)
+        else:
+            self._set_cover_image(arturl, arturl)
+
+    def show_saved_track(self, saved: dict):
+        """Show last run's track: its labels, and its cover from the artwork cache."""
+        self._set_track_labels(
+            saved.get("title") or "", saved.get("album") or "", saved.get("artist") or ""
+        )
+        if saved.get("art_url"):
+            self.show_saved_artwork(saved["art_url"])
+
+    def show_saved_artwork(self, arturl: str):
+        """Show last run's cover from the artwork cache, without downloading."""
+        parsed = urllib.parse.urlparse(arturl)
+        if parsed.scheme in ("http", "https"):
+            path = get_artwork_cache().path_for(arturl)
+        elif parsed.scheme == "file":
+            path = urllib.parse.unquote(parsed.path)
+        else:
+            path = arturl
+        if not os.path.isfile(path):
+            return
+        self._art_url = arturl
+        self._showing_wallpaper = False
+        self._set_cover_image(path, arturl)
+
+    def _set_cover_image(self, image_path, arturl=None):
         if image_path and os.path.isfile(image_path):
-            self.cover.set_image_from_file(image_path)
+            self.cover.set_image_from_file(
+                image_path,
+                on_loaded=lambda pixbuf: self._on_cover_art(arturl, pixbuf),
+            )
         else:
-            fallback = os.path.expanduser("~/Pictures/wallpaper/background.jpg")
-            self.cover.set_image_from_file(fallback)
-            file_obj = Gio.File.new_for_path(fallback)
-            monitor = file_obj.monitor_file(Gio.FileMonitorFlags.NONE, None)
-            monitor.connect("changed", self.on_wallpaper_changed)
-            self._wallpaper_monitor = monitor
-
-    def _download_and_set_artwork(self, arturl):
+            self._show_wallpaper()
+
+    def _on_cover_art(self, arturl, pixbuf):
+        self._cover_art = (arturl, pixbuf) if arturl else None
+        self.update_palette()
+
+    def update_palette(self):
+        """Theme the accents from this box's cover while it is the visible page."""
+        if not ALBUM_PALETTE.get("enable", False) or not self.get_child_visible():
+            return
+        from bar.services.palette import get_palette_service
+
+        if self._cover_art:
+            get_palette_service().apply(*self._cover_art)
+            return
+        # Use the cached palette while the cover is still loading
+        arturl = self.mpris_player.arturl if self.mpris_player else None
+        if not (arturl and get_palette_service().restore(arturl)):
+            get_palette_service().clear()
+
+    def _show_wallpaper(self):
+        self._showing_wallpaper = True
+        self._on_cover_art(None, None)
+        get_wallpaper_service().load(self.cover.pixel_size, self._on_wallpaper_loaded)
+
+    def _on_wallpaper_loaded(self, pixbuf):
+        # Artwork may have arrived while the wallpaper was decoding
+        if self._showing_wallpaper:
+            self.cover.set_image_from_pixbuf(pixbuf)
+
+    def _set_remote_artwork(self, arturl):
         """
-        Download the artwork from the given URL asynchronously and update the cover image
-        using GLib.idle_add to ensure UI updates occur on the main thread.
+        Show the artwork for the given URL, from the in-memory pixbuf cache if
+        possible, otherwise via the on-disk artwork cache (downloading it if needed).
         """
-        try:
-            parsed = urllib.parse.urlparse(arturl)
-            suffix = os.path.splitext(parsed.path)[1] or ".png"
-            with urllib.request.urlopen(arturl) as response:
-                data = response.read()
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            temp_file.write(data)
-            temp_file.close()
-            local_arturl = temp_file.name
-        except Exception:
-            local_arturl = os.path.expanduser("~/.current.wall")
-        GLib.idle_add(self._set_cover_image, local_arturl)
-        return None
+        cache = get_artwork_cache()
+        # Decoded at the device pixel size, so the scale factor is part of the key
+        pixbuf_key = (arturl, self.cover.pixel_size)
+        pixbuf = cache.get_pixbuf(pixbuf_key)
+        if pixbuf:
+            self.cover.set_image_from_pixbuf(pixbuf)
+            self._on_cover_art(arturl, pixbuf)
+            return
+
+        def on_fetched(path):
+            if arturl != self._art_url:
+                return  # Track changed while the artwork was downloading
+            if not path:
+                self._set_cover_image(None)
+                return
+            # Decoded at cover size off the main thread, then kept in memory
+            def on_loaded(pixbuf):
+                cache.put_pixbuf(pixbuf_key, pixbuf)
+                self._on_cover_art(arturl, pixbuf)
+
+            self.cover.set_image_from_file(path, on_loaded=on_loaded)
+
+        cache.fetch(arturl, on_fetched)
 
     def update_play_pause_icon(self):
         if self.mpris_player.playback_status == "playing":
@@ -308,8 +423,9 @@ class PlayerBox(Box):
         else:
             self.play_pause.get_child().set_markup(icons.play)
 
-    def on_wallpaper_changed(self, monitor, file, other_file, event):
-        self.cover.set_image_from_file(os.path.expanduser("~/.current.wall"))
+    def on_wallpaper_changed(self, service):
+        if self._showing_wallpaper:
+            self._show_wallpaper()
 
     # --- Control methods, defined only once each ---
     def _on_prev_clicked(self, button):
@@ -321,38 +437,84 @@ class PlayerBox(Box):
             self.mpris_player.play_pause()
             self.update_play_pause_icon()
 
-    def _on_backward_clicked(self, button):
-        # Only seek if player exists, can seek, and button is not disabled
-        if (
+    def _can_seek(self):
+        # Only seek if player exists, can seek, and seeking is not disabled
+        return bool(
             self.mpris_player
             and self.mpris_player.can_seek
-            and "disabled" not in self.backward.get_style_context().list_classes()
-        ):
-            new_pos = max(0, self.mpris_player.position - 5000000)  # 5 seconds backward
-            self.mpris_player.position = new_pos
+            and "disabled" not in self.forward.get_style_context().list_classes()
+        )
+
+    def _on_backward_clicked(self, button):
+        if self._can_seek():
+            self.mpris_player.seek(-5000000)  # 5 seconds backward
+            self._update_progress()
 
     def _on_forward_clicked(self, button):
-        # Only seek if player exists, can seek, and button is not disabled
-        if (
-            self.mpris_player
-            and self.mpris_player.can_seek
-            and "disabled" not in self.forward.get_style_context().list_classes()
-        ):
-            new_pos = self.mpris_player.position + 5000000  # 5 seconds forward
-            self.mpris_player.position = new_pos
+        if self._can_seek():
+            self.mpris_player.seek(5000000)  # 5 seconds forward
+            self._update_progress()
+
+    def _ring_fraction(self, x, y) -> float:
+        """Map a point to a fraction along the progress arc (180° to 360°)."""
+        allocation = self.seek_area.get_allocation()
+        dx, dy = x - allocation.width / 2, y - allocation.height / 2
+        angle = math.degrees(math.atan2(dy, dx)) % 360
+        if angle < 180:  # Below the arc, clamp to the nearer end
+            return 0.0 if dx < 0 else 1.0
+        return (angle - 180) / 180
+
+    def _scrub(self, fraction: float):
+        total = int(self.mpris_player.length or 0)
+        if total > 0:
+            self.mpris_player.scrub_to(int(fraction * total))
+            self._update_progress()
+
+    def _on_seek_press(self, widget, event):
+        if event.button != 1 or not self._can_seek():
+            return False
+        allocation = widget.get_allocation()
+        distance = math.hypot(
+            event.x - allocation.width / 2, event.y - allocation.height / 2
+        )
+        if distance < self.cover.size / 2:
+            return False  # Only the ring around the cover is draggable
+        self._scrubbing = True
+        self._scrub(self._ring_fraction(event.x, event.y))
+        return True
+
+    def _on_seek_motion(self, widget, event):
+        if not self._scrubbing or not self._can_seek():
+            return False
+        self._scrub(self._ring_fraction(event.x, event.y))
+        return True
+
+    def _on_seek_release(self, widget, event):
+        if not self._scrubbing:
+            return False
+        self._scrubbing = False
+        return True
 
     def _on_next_clicked(self, button):
         if self.mpris_player:
             self.mpris_player.next()
 
+    def _start_progress_ticks(self):
+        if not self._progress_tick_id:
+            self._progress_tick_id = self.progressbar.add_tick_callback(
+                lambda *_: self._update_progress()
+            )
+
+    def _stop_progress_ticks(self):
+        if self._progress_tick_id:
+            self.progressbar.remove_tick_callback(self._progress_tick_id)
+            self._progress_tick_id = None
+
     def _update_progress(self):
-        # Timer is now only active if can_seek is true, so no need for the initial check
+        # Ticks are only active if can_seek is true, so no need for the initial check
         if not self.mpris_player:  # Still need to check if player exists
-            # Should not happen if timer logic is correct, but good safeguard
-            if self._progress_timer_id:
-                GLib.source_remove(self._progress_timer_id)
-                self._progress_timer_id = None
-            return False  # Stop timer
+            self._progress_tick_id = None
+            return False  # Stop ticking
 
         try:
             current = self.mpris_player.position
@@ -366,16 +528,22 @@ class PlayerBox(Box):
         # Prevent division by zero or invalid updates
         if total <= 0:
             progress = 0.0
-            self.time.set_text("--:-- / --:--")
-            # Don't stop the timer here, length might become available later
+            seconds = None
+            if self._shown_seconds is not None:
+                self.time.set_text("--:-- / --:--")
+            # Don't stop ticking here, length might become available later
         else:
             progress = current / total
-            self.time.set_text(
-                f"{self._format_time(current)} / {self._format_time(total)}"
-            )
+            seconds = (current // 1000000, total // 1000000)
+            # Runs every frame; only relabel when the displayed second changes
+            if seconds != self._shown_seconds:
+                self.time.set_text(
+                    f"{self._format_time(current)} / {self._format_time(total)}"
+                )
+        self._shown_seconds = seconds
 
         self.progressbar.set_value(progress)
-        return True  # Continue the timer
+        return True  # Continue ticking
 
     def _format_time(self, us):
         seconds = int(us / 1000000)
@@ -391,7 +559,7 @@ class PlayerBox(Box):
 
     def _on_mpris_changed(self, *args):
         # Debounce metadata updates to avoid excessive work on the main thread.
-        if not hasattr(self, "_update_pending") or not self._update_pending:
+        if not self._update_pending:
             self._update_pending = True
             # Use idle_add for potentially faster UI response than timeout_add(100)
             GLib.idle_add(self._apply_mpris_properties_debounced)
@@ -401,15 +569,20 @@ class PlayerBox(Box):
         if self.mpris_player:
             self._apply_mpris_properties()
         else:
-            # Player vanished, ensure timer is stopped if it was running
-            if self._progress_timer_id:
-                GLib.source_remove(self._progress_timer_id)
-                self._progress_timer_id = None
+            # Player vanished, ensure ticking is stopped if it was running
+            self._stop_progress_ticks()
         self._update_pending = False
         return False
 
 
 class Player(Box):
+    """Stack of player boxes for every MPRIS player.
+
+    All known players are kept as a lightweight model; only a few `PlayerBox`
+    widgets exist at a time (the visible one and the most recently shown) and
+    they are rebound to whichever player is switched to.
+    """
+
     def __init__(self):
         super().__init__(
             name="player",
@@ -426,111 +599,178 @@ class Player(Box):
             v_align="center",
             v_expand=True,
         )
-        self.switcher = Gtk.StackSwitcher(
+        self.switcher = Box(
             name="player-switcher",
+            orientation="h",
             spacing=8,
+            h_align="center",
         )
-        self.switcher.set_stack(self.player_stack)
-        self.switcher.set_halign(Gtk.Align.CENTER)
+        # instance -> Playerctl player, in order of appearance. MprisPlayers
+        # (with their handlers and D-Bus proxy) exist only for bound boxes.
+        self._players: dict[str, Playerctl.Player] = {}
+        self._switcher_buttons: dict[str, Button] = {}
+        # instance -> bound box, least recently shown first
+        self._boxes: OrderedDict[str, PlayerBox] = OrderedDict()
+        # Unbound boxes, ready for reuse; one of them shows "Nothing Playing"
+        self._spare_boxes: list[PlayerBox] = []
+        self._visible_instance: str | None = None
+
+        saved = get_snapshot().get("player", {})
+        if ALBUM_PALETTE.get("enable", False) and saved.get("art_url"):
+            from bar.services.palette import get_palette_service
+
+            # Last run's accents while the players and their covers load
+            get_palette_service().restore(saved["art_url"])
+
+        restored = None
+        if saved.get("art_url") or saved.get("title"):
+            # Last run's track and cover, from the artwork cache, while the
+            # players load
+            restored = self._take_box()
+            restored.show_saved_track(saved)
+            self._spare_boxes.append(restored)
+
         self.mpris_manager = MprisPlayerManager()
-        players = self.mpris_manager.players
-        if players:
-            for p in players:
-                mp = MprisPlayer(p)
-                pb = PlayerBox(mpris_player=mp)
-                self.player_stack.add_titled(pb, mp.player_name, mp.player_name)
+        for p in self.mpris_manager.players or []:
+            self._add_player(p)
+        if saved.get("visible") in self._players:
+            self._show_player(saved["visible"])
+        elif self._players:
+            self._show_player(next(iter(self._players)))
         else:
-            pb = PlayerBox(mpris_player=None)
-            self.player_stack.add_titled(pb, "nothing", "Nothing Playing")
+            self._show_nothing()
+        if restored is not None and restored.mpris_player is None:
+            # The saved track belongs to a player that is gone
+            restored.bind(None)
+        get_snapshot().register("player", self._snapshot_state)
         self.mpris_manager.connect("player-appeared", self.on_player_appeared)
         self.mpris_manager.connect("player-vanished", self.on_player_vanished)
-        self.switcher.set_visible(True)
+        self.connect("destroy", self._on_destroy)
         self.add(self.player_stack)
         self.add(self.switcher)
-        GLib.idle_add(self._replace_switcher_labels)
+
+    def _on_destroy(self, *_):
+        get_snapshot().unregister("player", self._snapshot_state)
+        for box in self._boxes.values():
+            if box.mpris_player:
+                box.mpris_player.release()
+
+    def _snapshot_state(self) -> dict:
+        box = self._boxes.get(self._visible_instance)
+        visible = box.mpris_player if box else None
+        track = visible.metadata if visible else None
+        return {
+            "visible": self._visible_instance,
+            "art_url": visible.arturl if visible else None,
+            "title": track.title if track else None,
+            "album": track.album if track else None,
+            "artist": track.artist if track else None,
+        }
 
     def on_player_appeared(self, manager, player):
-        children = self.player_stack.get_children()
-        if len(children) == 1 and not getattr(children[0], "mpris_player", None):
-            self.player_stack.remove(children[0])
-        mp = MprisPlayer(player)
-        pb = PlayerBox(mpris_player=mp)
-        self.player_stack.add_titled(pb, mp.player_name, mp.player_name)
-        # Timer is now started conditionally within PlayerBox.__init__
-        self.switcher.set_visible(True)
-        GLib.idle_add(lambda: self._update_switcher_for_player(mp.player_name))
-        GLib.idle_add(self._replace_switcher_labels)
-
-    def on_player_vanished(self, manager, player_name):
-        for child in self.player_stack.get_children():
-            if (
-                hasattr(child, "mpris_player")
-                and child.mpris_player
-                and child.mpris_player.player_name == player_name
-            ):
-                self.player_stack.remove(child)
-                break
-        if not any(
-            getattr(child, "mpris_player", None)
-            for child in self.player_stack.get_children()
-        ):
-            pb = PlayerBox(mpris_player=None)
-            self.player_stack.add_titled(pb, "nothing", "Nothing Playing")
-        self.switcher.set_visible(True)
-        GLib.idle_add(self._replace_switcher_labels)
-
-    def _replace_switcher_labels(self):
-        buttons = self.switcher.get_children()
-        for btn in buttons:
-            if isinstance(btn, Gtk.ToggleButton):
-                default_label = None
-                for child in btn.get_children():
-                    if isinstance(child, Gtk.Label):
-                        default_label = child
-                        break
-                if default_label:
-                    label_player_name = getattr(
-                        default_label, "player_name", default_label.get_text().lower()
-                    )
-                    icon_markup = get_player_icon_markup_by_name(label_player_name)
-                    btn.remove(default_label)
-                    new_label = Label(name="player-label", markup=icon_markup)
-                    new_label.player_name = label_player_name
-                    btn.add(new_label)
-                    new_label.show_all()
-        return False
+        instance = player.get_property("player-instance")
+        if instance in self._players:
+            return
+        self._add_player(player)
+        if self._visible_instance is None:
+            self._show_player(instance)
 
-    def _update_switcher_for_player(self, player_name):
-        for btn in self.switcher.get_children():
-            if isinstance(btn, Gtk.ToggleButton):
-                default_label = None
-                for child in btn.get_children():
-                    if isinstance(child, Gtk.Label):
-                        default_label = child
-                        break
-                if default_label:
-                    label_player_name = getattr(
-                        default_label, "player_name", default_label.get_text().lower()
-                    )
-                    if label_player_name == player_name.lower():
-                        icon_markup = get_player_icon_markup_by_name(player_name)
-                        btn.remove(default_label)
-                        new_label = Label(name="player-label", markup=icon_markup)
-                        new_label.player_name = player_name.lower()
-                        btn.add(new_label)
-                        new_label.show_all()
-        return False
+    def on_player_vanished(self, manager, player_instance):
+        if self._players.pop(player_instance, None) is None:
+            return
+        self._switcher_buttons.pop(player_instance).destroy()
+
+        box = self._boxes.pop(player_instance, None)
+        if box:
+            self._bind(box, None)
+            self._spare_boxes.append(box)
+
+        if player_instance == self._visible_instance:
+            self._visible_instance = None
+            if self._boxes:
+                self._show_player(next(reversed(self._boxes)))
+            elif self._players:
+                self._show_player(next(iter(self._players)))
+            else:
+                self._show_nothing()
+
+    def _add_player(self, player: Playerctl.Player):
+        instance = player.get_property("player-instance")
+        self._players[instance] = player
+        button = Button(
+            name="player-switcher-button",
+            child=Label(
+                name="player-label",
+                markup=get_player_icon_markup_by_name(
+                    player.get_property("player-name")
+                ),
+            ),
+            on_clicked=lambda *_: self._show_player(instance),
+        )
+        add_hover_cursor(button)
+        self._switcher_buttons[instance] = button
+        self.switcher.add(button)
+        button.show_all()
+
+    def _bind(self, box: PlayerBox, instance: str | None):
+        """Bind `box` to a fresh MprisPlayer for `instance`, releasing the old one."""
+        previous = box.mpris_player
+        box.bind(MprisPlayer(self._players[instance]) if instance else None)
+        if previous:
+            previous.release()
+
+    def _take_box(self) -> PlayerBox:
+        if self._spare_boxes:
+            return self._spare_boxes.pop()
+        if len(self._boxes) < MAX_PLAYER_BOXES:
+            box = PlayerBox()
+            self.player_stack.add(box)
+            box.show_all()
+            return box
+        # Recycle the least recently shown box; the visible one is always last
+        _, box = self._boxes.popitem(last=False)
+        return box
+
+    def _show_player(self, instance: str):
+        box = self._boxes.pop(instance, None)
+        if box is None:
+            box = self._take_box()
+            self._bind(box, instance)
+        self._boxes[instance] = box
+        self.player_stack.set_visible_child(box)
+        box.update_palette()
+        self._set_switcher_active(instance)
+
+    def _show_nothing(self):
+        if not self._spare_boxes:
+            self._spare_boxes.append(self._take_box())
+        self.player_stack.set_visible_child(self._spare_boxes[-1])
+        self._spare_boxes[-1].update_palette()
+        self._set_switcher_active(None)
+
+    def _set_switcher_active(self, instance: str | None):
+        previous = self._switcher_buttons.get(self._visible_instance)
+        if previous:
+            previous.remove_style_class("active")
+        current = self._switcher_buttons.get(instance)
+        if current:
+            current.add_style_class("active")
+        self._visible_instance = instance
 
 
 class PlayerSmall(CenterBox):
     def __init__(self):
+        from bar.modules.cavalcade import NUMPY_AVAILABLE, SpectrumRender
+
         super().__init__(
             name="player-small", orientation="h", h_align="fill", v_align="center"
         )
         self._show_artist = False  # toggle flag
         self._display_options = ["cavalcade", "title", "artist"]
+        if not NUMPY_AVAILABLE:
+            self._display_options.remove("cavalcade")
         self._display_index = 0
-        self._current_display = "cavalcade"
+        self._current_display = self._display_options[0]
 
         self.mpris_icon = Button(
             name="compact-mpris-icon",
@@ -568,8 +808,12 @@ class PlayerSmall(CenterBox):
         # Add hover effect
         add_hover_cursor(self.mpris_button)
 
-        # self.cavalcade = SpectrumRender()
-        # self.cavalcade_box = self.cavalcade.get_spectrum_box()
+        self.cavalcade = None
+        stack_children = [self.mpris_label]
+        if NUMPY_AVAILABLE:
+            self.cavalcade = SpectrumRender()
+            self.cavalcade_box = self.cavalcade.get_spectrum_box()
+            stack_children.insert(0, self.cavalcade_box)
 
         self.center_stack = Stack(
             name="compact-mpris",
@@ -577,12 +821,10 @@ class PlayerSmall(CenterBox):
             transition_duration=100,
             v_align="center",
             v_expand=False,
-            children=[
-                # self.cavalcade_box,
-                self.mpris_label,
-            ],
+            children=stack_children,
         )
-        # self.center_stack.set_visible_child(self.cavalcade_box)  # default to cavalcade
+        if self.cavalcade:
+            self.center_stack.set_visible_child(self.cavalcade_box)  # default to cavalcade
 
         # Create additional compact view.
         self.mpris_small = CenterBox(
@@ -622,14 +864,16 @@ class PlayerSmall(CenterBox):
             self.mpris_label.set_text("Nothing Playing")
             self.mpris_button.get_child().set_markup(icons.stop)
             self.mpris_icon.get_child().set_markup(icons.disc)
+            if self.cavalcade:
+                self.cavalcade.set_playing(False)
             if self._current_display != "cavalcade":
                 self.center_stack.set_visible_child(
                     self.mpris_label
                 )  # if was title or artist, keep showing label
-            # else:
-            # self.center_stack.set_visible_child(
-            #     self.cavalcade_box
-            # )  # default to cavalcade if no player
+            else:
+                self.center_stack.set_visible_child(
+                    self.cavalcade_box
+                )  # default to cavalcade if no player
             return
 
         mp = self.mpris_player
@@ -644,16 +888,21 @@ class PlayerSmall(CenterBox):
         self.mpris_icon.get_child().set_markup(icon_markup)
         self.update_play_pause_icon()
 
+        track = mp.metadata
         if self._current_display == "title":
-            text = mp.title if mp.title and mp.title.strip() else "Nothing Playing"
+            text = track.title if track.title.strip() else "Nothing Playing"
             self.mpris_label.set_text(text)
             self.center_stack.set_visible_child(self.mpris_label)
         elif self._current_display == "artist":
-            text = mp.artist if mp.artist else "Nothing Playing"
+            text = track.artist or "Nothing Playing"
             self.mpris_label.set_text(text)
             self.center_stack.set_visible_child(self.mpris_label)
-        # else:  # default cavalcade
-        # self.center_stack.set_visible_child(self.cavalcade_box)
+        else:  # default cavalcade
+            self.center_stack.set_visible_child(self.cavalcade_box)
+
+        # Capture also stops by itself while the cavalcade page is unmapped
+        if self.cavalcade:
+            self.cavalcade.set_playing(mp.playback_status == "playing")
 
     def _on_icon_button_press(self, widget, event):
         from gi.repository import Gdk
@@ -738,12 +987,12 @@ class PlayerSmall(CenterBox):
             self._apply_mpris_properties()
             self.mpris_player.connect("changed", self._on_mpris_changed)
 
-    def on_player_vanished(self, manager, player_name):
+    def on_player_vanished(self, manager, player_instance):
         players = self.mpris_manager.players
         if (
             players
             and self.mpris_player
-            and self.mpris_player.player_name == player_name
+            and self.mpris_player.player_instance == player_instance
         ):
             if players:  # Check if players is not empty after vanishing
                 self.current_index = self.current_index % len(players)
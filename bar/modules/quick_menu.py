@@ -14,9 +14,9 @@ class QuickMenuItem(Box):
             orientation="h",
             spacing=12,
             name="quick-menu-item",
+            style_classes=["quick-menu-item"],
             **kwargs
         )
-        self.set_style("padding: 8px 12px; min-width: 280px;")
 
         # Icon and title on the left
         left_box = Box(orientation="h", spacing=8)
@@ -24,8 +24,7 @@ class QuickMenuItem(Box):
             icon = Image(icon_name=icon_name, icon_size=16)
             left_box.add(icon)
 
-        self.title_label = Label(title)
-        self.title_label.set_style("font-size: 14px;")
+        self.title_label = Label(title, style_classes=["quick-menu-item-title"])
         left_box.add(self.title_label)
 
         self.add(left_box)
@@ -45,22 +44,21 @@ class QuickMenuToggle(QuickMenuItem):
         # Create toggle indicator box
         self.toggle_box = Box(
             orientation="h",
-            spacing=0
+            spacing=0,
+            style_classes=["quick-menu-toggle"],
         )
-        self.toggle_box.set_style("min-width: 44px; min-height: 24px; border-radius: 12px; padding: 2px;")
 
         # Toggle indicator (circle)
-        self.toggle_indicator = Label("")
-        self.toggle_indicator.set_style("min-width: 20px; min-height: 20px; border-radius: 10px; background: white;")
+        self.toggle_indicator = Label("", style_classes=["quick-menu-toggle-indicator"])
 
         self.toggle_box.add(self.toggle_indicator)
 
         # Make it clickable
         self.toggle_button = Button(
             child=self.toggle_box,
-            on_clicked=self._on_click
+            on_clicked=self._on_click,
+            style_classes=["quick-menu-flat-button"],
         )
-        self.toggle_button.set_style("background: transparent; border: none; padding: 0;")
 
         # Add spacer to push toggle to the right
         spacer = Label("", h_expand=True)
@@ -77,26 +75,13 @@ class QuickMenuToggle(QuickMenuItem):
             self._on_toggle(self._active)
 
     def _update_appearance(self):
+        # Geometry and transitions live in the stylesheet; only the state class changes
         if self._active:
-            self.toggle_box.set_style_classes(["toggle-active"])
-            self.toggle_box.set_style(
-                "min-width: 44px; min-height: 24px; border-radius: 12px; padding: 2px; "
-                "transition: all 0.2s;"
-            )
-            self.toggle_indicator.set_style(
-                "min-width: 20px; min-height: 20px; border-radius: 10px; "
-                "background: white; margin-left: 20px; transition: all 0.2s;"
-            )
+            self.toggle_box.remove_style_class("toggle-inactive")
+            self.toggle_box.add_style_class("toggle-active")
         else:
-            self.toggle_box.set_style_classes(["toggle-inactive"])
-            self.toggle_box.set_style(
-                "min-width: 44px; min-height: 24px; border-radius: 12px; padding: 2px; "
-                "transition: all 0.2s;"
-            )
-            self.toggle_indicator.set_style(
-                "min-width: 20px; min-height: 20px; border-radius: 10px; "
-                "background: white; margin-left: 0px; transition: all 0.2s;"
-            )
+            self.toggle_box.remove_style_class("toggle-active")
+            self.toggle_box.add_style_class("toggle-inactive")
 
     def set_active(self, active):
         self._active = active
@@ -115,13 +100,12 @@ class QuickMenuButton(QuickMenuItem):
             # Make the entire item clickable
             button_overlay = Button(
                 child=Box(),  # Empty box as child
-                on_clicked=on_click
+                on_clicked=on_click,
+                style_classes=["quick-menu-flat-button"],
             )
-            button_overlay.set_style("background: transparent; border: none; padding: 0; margin: 0;")
 
         # Add arrow indicator on the right
-        arrow = Label("›")
-        arrow.set_style("font-size: 18px; opacity: 0.5;")
+        arrow = Label("›", style_classes=["quick-menu-arrow"])
         spacer = Label("", h_expand=True)
         self.add(spacer)
         self.add(arrow)
@@ -140,9 +124,9 @@ class QuickMenuSection(Box):
         if title:
             title_label = Label(
                 title,
-                name="section-title"
+                name="section-title",
+                style_classes=["section-title"],
             )
-            title_label.set_style("font-size: 12px; opacity: 0.6; padding: 8px 12px 4px 12px; font-weight: bold;")
             self.add(title_label)
 
         self.items_box = Box(orientation="v", spacing=2)
@@ -178,25 +162,23 @@ class QuickMenu(Window):
         # Title
         title_box = Box(
             orientation="h",
-            spacing=8
+            spacing=8,
+            name="quick-menu-header",
         )
-        title_box.set_style("padding: 12px;")
-        title = Label("Quick Menu")
-        title.set_style("font-size: 16px; font-weight: bold;")
+        title = Label("Quick Menu", name="quick-menu-title")
         title_box.add(title)
 
         self.main_box.add(title_box)
         # Add a simple divider line
-        divider = Label("")
-        divider.set_style("min-height: 1px; background: rgba(255,255,255,0.1); margin: 0px 12px;")
+        divider = Label("", style_classes=["quick-menu-separator", "header"])
         self.main_box.add(divider)
 
         # Sections container
         self.sections_container = Box(
             orientation="v",
-            spacing=8
+            spacing=8,
+            name="quick-menu-sections",
         )
-        self.sections_container.set_style("padding: 8px 0px;")
         self.main_box.add(self.sections_container)
 
         self.children = self.main_box
@@ -214,8 +196,7 @@ class QuickMenu(Window):
 
         # Add separator before section if not the first
         if len(self.sections) > 1:
-            separator = Label("")
-            separator.set_style("min-height: 1px; background: rgba(255,255,255,0.1); margin: 4px 12px;")
+            separator = Label("", style_classes=["quick-menu-separator"])
             self.sections_container.add(separator)
 
         return section
@@ -1,56 +1,118 @@
-from bar.config import STYLIX
-import tempfile
+"""
+Stylix theme CSS.
+
+The structural stylesheet refers to the base16 colors by name (`@base00` ...)
+and is rendered from the Stylix fonts into the XDG cache dir under a name
+derived from a hash of those inputs and the template version, so it is loaded
+straight from disk on the next start. The colors themselves are a small
+`@define-color` palette (see `render_palette_css`) that `ThemeService` swaps at
+runtime.
+"""
+
+import hashlib
+import json
 import os
 
+import yaml
+from loguru import logger
+from platformdirs import user_cache_dir
+
+from bar.config import APP_NAME, STYLIX
+
+
+STYLIX_CACHE_DIR = os.path.join(user_cache_dir(appname=APP_NAME), "stylix")
+# Bump whenever the CSS template below changes so cached files are rebuilt
+TEMPLATE_VERSION = 5
+
+# Default colors if Stylix is not properly configured
+DEFAULT_COLORS = {
+    "base00": "1e1e2e",  # background
+    "base01": "313244",  # lighter background
+    "base02": "45475a",  # selection background
+    "base03": "585b70",  # comments
+    "base04": "bac2de",  # dark foreground
+    "base05": "cdd6f4",  # foreground
+    "base06": "f5e0dc",  # light foreground
+    "base07": "b4befe",  # light background
+    "base08": "f38ba8",  # red
+    "base09": "fab387",  # orange
+    "base0A": "f9e2af",  # yellow
+    "base0B": "a6e3a1",  # green
+    "base0C": "94e2d5",  # cyan
+    "base0D": "89b4fa",  # blue
+    "base0E": "cba6f7",  # purple
+    "base0F": "f2cdcd",  # brown
+}
+
+
+def load_scheme(path: str) -> dict:
+    """Read the base16 colors from a scheme file.
+
+    Both the classic layout (`base00: "1e1e2e"` at the top level) and the
+    tinted-theming one (under `palette:`, with a leading `#`) are accepted.
+    """
+    with open(os.path.expanduser(path), "r") as f:
+        scheme = yaml.safe_load(f) or {}
+    scheme = scheme.get("palette", scheme)
+    return {
+        key: str(value).lstrip("#")
+        for key, value in scheme.items()
+        if key in DEFAULT_COLORS
+    }
 
-def generate_stylix_css():
-    """Generate CSS using Stylix colors if enabled"""
-    if not STYLIX.get("enable", False):
-        return None
 
-    colors = STYLIX.get("colors", {})
-    fonts = STYLIX.get("fonts", {})
-
-    # Default colors if Stylix is not properly configured
-    default_colors = {
-        "base00": "1e1e2e",  # background
-        "base01": "313244",  # lighter background
-        "base02": "45475a",  # selection background
-        "base03": "585b70",  # comments
-        "base04": "bac2de",  # dark foreground
-        "base05": "cdd6f4",  # foreground
-        "base06": "f5e0dc",  # light foreground
-        "base07": "b4befe",  # light background
-        "base08": "f38ba8",  # red
-        "base09": "fab387",  # orange
-        "base0A": "f9e2af",  # yellow
-        "base0B": "a6e3a1",  # green
-        "base0C": "94e2d5",  # cyan
-        "base0D": "89b4fa",  # blue
-        "base0E": "cba6f7",  # purple
-        "base0F": "f2cdcd",  # brown
+def resolve_colors(stylix: dict = STYLIX) -> dict:
+    """The base16 palette: defaults, then config colors, then the scheme file."""
+    # Use Stylix colors or fallback to defaults
+    colors = {**DEFAULT_COLORS, **stylix.get("colors", {})}
+    scheme_path = stylix.get("scheme")
+    if scheme_path:
+        try:
+            colors.update(load_scheme(scheme_path))
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning(f"[Stylix] Failed to read scheme {scheme_path}: {e}")
+    return colors
+
+
+def resolve_theme(stylix: dict = STYLIX) -> dict:
+    """Collect the structural template inputs from the Stylix config."""
+    fonts = stylix.get("fonts", {})
+    font_sizes = fonts.get("sizes", {})
+    return {
+        # Default font
+        "font_family": fonts.get("sansSerif", "sans-serif"),
+        # Use desktop font size for the bar, fallback to applications, then default
+        "font_size": font_sizes.get("desktop", font_sizes.get("applications", 14)),
     }
 
-    # Use Stylix colors or fallback to defaults
-    for key in default_colors:
-        if key not in colors:
-            colors[key] = default_colors[key]
 
-    # Default font
-    font_family = fonts.get("sansSerif", "sans-serif")
-    font_sizes = fonts.get("sizes", {})
-    # Use desktop font size for the bar, fallback to applications, then default
-    font_size = font_sizes.get("desktop", font_sizes.get("applications", 14))
+def theme_key(theme: dict) -> str:
+    """Content hash of the template inputs and version."""
+    payload = json.dumps(
+        {"version": TEMPLATE_VERSION, **theme}, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def render_palette_css(colors: dict) -> str:
+    """The `@define-color` palette the structural stylesheet refers to."""
+    return "".join(
+        f"@define-color {key} #{colors[key]};\n" for key in DEFAULT_COLORS
+    )
+
+
+def render_stylix_css(theme: dict) -> str:
+    """Render the structural Stylix stylesheet for `theme` (see `resolve_theme`)."""
+    font_family = theme["font_family"]
+    font_size = theme["font_size"]
 
     # Calculate relative font sizes
     small_font = max(int(font_size * 0.85), 10)  # Minimum 10px
     large_font = int(font_size * 1.1)
 
-    # Debug logging
-    from loguru import logger
     logger.info(f"[Stylix] Using font sizes - Base: {font_size}px, Small: {small_font}px, Large: {large_font}px")
 
-    # Generate GTK CSS with Stylix colors
+    # Generate GTK CSS referring to the Stylix palette colors
     css_content = f"""/* Stylix-generated theme */
 
 /* Apply Stylix font */
@@ -63,38 +125,38 @@ def generate_stylix_css():
 #bar-inner {{
     padding: 4px;
     border-bottom: solid 2px;
-    border-color: #{colors["base02"]};
-    background-color: #{colors["base00"]};
+    border-color: @base02;
+    background-color: @base00;
 }}
 
 #center-container {{
-    color: #{colors["base05"]};
+    color: @base05;
 }}
 
 .active-window {{
-    color: #{colors["base05"]};
+    color: @base05;
     font-weight: bold;
 }}
 
 /* Battery */
 #battery-widget {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
     padding: 4px 8px;
     border-radius: 12px;
 }}
 
 #bat-icon {{
-    color: #{colors["base0D"]};
+    color: @base0D;
     margin-right: 2px;
 }}
 
 #bat-label {{
-    color: #{colors["base05"]};
+    color: @base05;
     font-size: {font_size}px;
 }}
 
 #bat-label.battery-low {{
-    color: #{colors["base08"]};
+    color: @base08;
     font-weight: bold;
 }}
 
@@ -107,30 +169,30 @@ def generate_stylix_css():
 }}
 
 #cpu-progress-bar {{
-    border: solid 0px alpha(#{colors["base0E"]}, 0.8);
+    border: solid 0px alpha(@base0E, 0.8);
 }}
 
 #ram-progress-bar,
 #volume-progress-bar {{
-    border: solid 0px #{colors["base0D"]};
+    border: solid 0px @base0D;
 }}
 
 /* Widgets container */
 #widgets-container {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
     padding: 2px;
     border-radius: 16px;
 }}
 
 /* NixOS label */
 #nixos-label {{
-    color: #{colors["base0D"]};
+    color: @base0D;
 }}
 
 /* Date time */
 #date-time {{
-    color: #{colors["base05"]};
-    background-color: #{colors["base01"]};
+    color: @base05;
+    background-color: @base01;
     padding: 4px 8px;
     border-radius: 12px;
 }}
@@ -147,8 +209,8 @@ def generate_stylix_css():
 .popup-window,
 #calendar-popup,
 #quick-menu {{
-    background-color: #{colors["base00"]};
-    border: solid 2px #{colors["base02"]};
+    background-color: @base00;
+    border: solid 2px @base02;
     border-radius: 12px;
     box-shadow: 0 8px 32px rgba(0, 0, 0, 0.4), 0 2px 8px rgba(0, 0, 0, 0.2);
     animation: slide-down 200ms ease-out;
@@ -168,22 +230,41 @@ def generate_stylix_css():
     }}
 }}
 
+/* With workspaces.animation: drawn, opacity only, so the popup surface is not
+   resized on every frame */
+.popup-window.fade-in,
+#calendar-popup.fade-in,
+#quick-menu.fade-in {{
+    animation: fade-in 200ms ease-out;
+}}
+
+@keyframes fade-in {{
+    from {{
+        opacity: 0;
+    }}
+    to {{
+        opacity: 1;
+    }}
+}}
+
 #calendar-title {{
-    color: #{colors["base05"]};
+    color: @base05;
     font-weight: bold;
     font-size: {large_font}px;
     margin-bottom: 8px;
 }}
 
 #events-box {{
-    background-color: #{colors["base00"]};
-    border: solid 1px #{colors["base02"]};
+    min-width: 450px;
+    min-height: 200px;
+    background-color: @base00;
+    border: solid 1px @base02;
     border-radius: 8px;
     padding: 16px;
 }}
 
 #no-events {{
-    color: #{colors["base03"]};
+    color: @base03;
 }}
 
 /* Calendar event items */
@@ -194,16 +275,22 @@ def generate_stylix_css():
     transition: background-color 0.15s ease;
 }}
 
+/* Fixed width for consistent alignment */
+.event-time,
+.current-time-label {{
+    min-width: 100px;
+}}
+
 #event-content {{
     margin-left: 8px;
 }}
 
 .event-item.upcoming {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
 }}
 
 .event-item.past {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
     opacity: 0.6;
 }}
 
@@ -213,11 +300,11 @@ def generate_stylix_css():
 }}
 
 .event-title.upcoming {{
-    color: #{colors["base05"]};
+    color: @base05;
 }}
 
 .event-title.past {{
-    color: #{colors["base04"]};
+    color: @base04;
 }}
 
 .event-time {{
@@ -225,11 +312,11 @@ def generate_stylix_css():
 }}
 
 .event-time.upcoming {{
-    color: #{colors["base04"]};
+    color: @base04;
 }}
 
 .event-time.past {{
-    color: #{colors["base03"]};
+    color: @base03;
 }}
 
 .event-location {{
@@ -237,20 +324,20 @@ def generate_stylix_css():
 }}
 
 .event-location.upcoming {{
-    color: #{colors["base03"]};
+    color: @base03;
 }}
 
 .event-location.past {{
-    color: #{colors["base03"]};
+    color: @base03;
     opacity: 0.8;
 }}
 
 /* Tooltips */
 tooltip {{
     border: solid 2px;
-    border-color: #{colors["base02"]};
-    background-color: #{colors["base00"]};
-    color: #{colors["base05"]};
+    border-color: @base02;
+    background-color: @base00;
+    color: @base05;
     border-radius: 16px;
 }}
 
@@ -260,43 +347,64 @@ tooltip>* {{
 
 /* Workspaces */
 #workspaces {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
     padding: 6px 6px;
     border-radius: 16px;
 }}
 
 #workspaces>button {{
-    background-color: #{colors["base05"]};
+    background-color: @base05;
     border-radius: 100px;
     padding: 0px 4px;
     transition: padding 0.05s steps(8);
 }}
 
 #workspaces>button.empty:not(.active):not(.visible) {{
-    background-color: #{colors["base03"]};
+    background-color: @base03;
 }}
 
 #workspaces>button.visible:not(.active) {{
-    background-color: #{colors["base0E"]};
+    background-color: @base0E;
 }}
 
 #workspaces>button.active {{
-    background-color: #{colors["base0D"]};
+    background-color: @base0D;
     padding: 0px 16px;
     border-radius: 100px;
 }}
 
 #workspaces>button.urgent {{
-    background-color: #{colors["base08"]};
+    background-color: @base08;
 }}
 
 #workspaces>button>label {{
     font-size: 0px;
 }}
 
+/* Drawn pills (workspaces.animation: drawn) */
+#workspace-pills {{
+    color: @base05;
+}}
+
+#workspace-pills.empty:not(.active):not(.visible) {{
+    color: @base03;
+}}
+
+#workspace-pills.visible:not(.active) {{
+    color: @base0E;
+}}
+
+#workspace-pills.active {{
+    color: @base0D;
+}}
+
+#workspace-pills.urgent {{
+    color: @base08;
+}}
+
 /* Quick Menu styling */
 #quick-menu-container {{
-    background-color: #{colors["base00"]};
+    background-color: @base00;
     border-radius: 8px;
 }}
 
@@ -306,33 +414,76 @@ tooltip>* {{
     padding: 4px;
     margin: 0;
     box-shadow: none;
-    color: #{colors["base05"]};
+    color: @base05;
 }}
 
 #quick-menu-button:hover {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
     border-radius: 8px;
 }}
 
+#quick-menu-header {{
+    padding: 12px;
+}}
+
+#quick-menu-title {{
+    font-size: 16px;
+    font-weight: bold;
+}}
+
+#quick-menu-sections {{
+    padding: 8px 0px;
+}}
+
+.quick-menu-separator {{
+    min-height: 1px;
+    background: alpha(@base05, 0.1);
+    margin: 4px 12px;
+}}
+
+.quick-menu-separator.header {{
+    margin: 0px 12px;
+}}
+
 .quick-menu-item {{
+    padding: 8px 12px;
+    min-width: 280px;
     border-radius: 6px;
     transition: background-color 0.15s ease;
 }}
 
+.quick-menu-item-title {{
+    font-size: 14px;
+}}
+
+.quick-menu-arrow {{
+    font-size: 18px;
+    opacity: 0.5;
+}}
+
+.quick-menu-flat-button {{
+    background: transparent;
+    border: none;
+    padding: 0;
+    margin: 0;
+}}
+
 .quick-menu-item:hover {{
-    background-color: #{colors["base01"]};
+    background-color: @base01;
 }}
 
 .section-title {{
-    color: #{colors["base04"]};
+    color: @base04;
     font-weight: bold;
     font-size: {small_font}px;
+    opacity: 0.6;
+    padding: 8px 12px 4px 12px;
 }}
 
 /* Vinyl button styling */
 #vinyl-button {{
     background-color: transparent;
-    color: #{colors["base05"]};
+    color: @base05;
     border: none;
     padding: 4px;
     margin: 0px;
@@ -340,8 +491,8 @@ tooltip>* {{
 }}
 
 #vinyl-button.active {{
-    background-color: #{colors["base0B"]};
-    color: #{colors["base00"]};
+    background-color: @base0B;
+    color: @base00;
 }}
 
 #vinyl-icon {{
@@ -349,26 +500,72 @@ tooltip>* {{
 }}
 
 /* Toggle switch styling for quick menu */
+.quick-menu-toggle {{
+    min-width: 44px;
+    min-height: 24px;
+    border-radius: 12px;
+    padding: 2px;
+    transition: all 0.2s;
+}}
+
+.quick-menu-toggle-indicator {{
+    min-width: 20px;
+    min-height: 20px;
+    border-radius: 10px;
+    background: white;
+    margin-left: 0px;
+    transition: all 0.2s;
+}}
+
+.toggle-active .quick-menu-toggle-indicator {{
+    margin-left: 20px;
+}}
+
 .toggle-active {{
-    background-color: #{colors["base0B"]};
+    background-color: @base0B;
 }}
 
 .toggle-inactive {{
-    background-color: #{colors["base02"]};
+    background-color: @base02;
 }}
 """
 
-    # Write to temporary file
-    temp_fd, temp_path = tempfile.mkstemp(suffix=".css", prefix="stylix_")
-    try:
-        with os.fdopen(temp_fd, "w") as f:
-            f.write(css_content)
-        return temp_path
-    except Exception:
-        os.close(temp_fd)
-        return None
+    return css_content
+
+
+def _write_atomic(path: str, content: str):
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(keep: str):
+    with os.scandir(STYLIX_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.startswith("stylix-") and entry.path != keep:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
 
 
 def get_stylix_css_path():
-    """Get the path to the Stylix CSS file"""
-    return generate_stylix_css()
+    """Get the path to the Stylix CSS file, rendering it only if the theme changed"""
+    if not STYLIX.get("enable", False):
+        return None
+
+    theme = resolve_theme()
+    path = os.path.join(STYLIX_CACHE_DIR, f"stylix-{theme_key(theme)}.css")
+    if os.path.isfile(path):
+        return path
+
+    try:
+        os.makedirs(STYLIX_CACHE_DIR, exist_ok=True)
+        _write_atomic(path, render_stylix_css(theme))
+        _remove_stale(keep=path)
+    except OSError as e:
+        logger.warning(f"[Stylix] Failed to write CSS cache: {e}")
+        return None
+    logger.info(f"[Stylix] Rendered theme to {path}")
+    return path
@@ -0,0 +1,62 @@
+"""
+Control client for a running bar.
+
+    bar msg finder
+    bar msg toggle calendar
+    bar msg reload-css
+
+Sends one command line over the bar's unix socket and prints the reply. Only
+the standard library is imported, so a keybinding pays for an interpreter
+start and nothing else.
+"""
+
+import os
+import socket
+import sys
+
+
+SOCKET_NAME = "makku_bar.sock"
+TIMEOUT = 2  # seconds
+
+
+def socket_path() -> str:
+    """The control socket of the bar, in the user's runtime dir."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    return os.path.join(runtime_dir, SOCKET_NAME)
+
+
+def send(command: str, path: str | None = None) -> str:
+    """Send `command` to the running bar and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(TIMEOUT)
+        sock.connect(path or socket_path())
+        sock.sendall(f"{command}\n".encode())
+        reply = b""
+        while chunk := sock.recv(4096):
+            reply += chunk
+    return reply.decode().strip()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print("usage: bar msg <command> [args...]", file=sys.stderr)
+        return 2
+
+    try:
+        reply = send(" ".join(args))
+    except OSError as e:
+        print(f"makku_bar is not running ({socket_path()}: {e})", file=sys.stderr)
+        return 1
+
+    status, _, message = reply.partition(" ")
+    if status != "ok":
+        print(reply or "error: no reply", file=sys.stderr)
+        return 1
+    if message:
+        print(message)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Content-addressed album art cache.
+
+Remote artwork is stored under the XDG cache dir keyed by a hash of its URL,
+kept below a size cap by evicting the least recently used files, and
+revalidated with conditional requests once it goes stale. Concurrent fetches
+of the same URL share a single download, and a few decoded pixbufs are kept
+in memory so a repeated track shows its cover without touching disk.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from collections.abc import Callable
+
+from gi.repository import GLib
+from loguru import logger
+from platformdirs import user_cache_dir
+
+from bar.config import APP_NAME
+
+
+ARTWORK_CACHE_DIR = os.path.join(user_cache_dir(appname=APP_NAME), "artwork")
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+MAX_CACHED_PIXBUFS = 8
+FETCH_TIMEOUT = 10  # seconds
+REVALIDATE_AFTER = 24 * 60 * 60  # seconds
+
+
+class ArtworkCache:
+    """Disk and memory cache for remote artwork."""
+
+    def __init__(
+        self,
+        cache_dir: str = ARTWORK_CACHE_DIR,
+        max_bytes: int = MAX_CACHE_BYTES,
+        max_pixbufs: int = MAX_CACHED_PIXBUFS,
+    ):
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._max_pixbufs = max_pixbufs
+        self._pixbufs: OrderedDict = OrderedDict()
+        # url -> [(callback, only_if_changed)] waiting on one download
+        self._in_flight: dict[str, list[tuple[Callable, bool]]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def path_for(self, url: str) -> str:
+        return os.path.join(self._cache_dir, self.key_for(url))
+
+    # Decoded pixbufs
+    def get_pixbuf(self, key):
+        pixbuf = self._pixbufs.get(key)
+        if pixbuf is not None:
+            self._pixbufs.move_to_end(key)
+        return pixbuf
+
+    def put_pixbuf(self, key, pixbuf):
+        self._pixbufs[key] = pixbuf
+        self._pixbufs.move_to_end(key)
+        while len(self._pixbufs) > self._max_pixbufs:
+            self._pixbufs.popitem(last=False)
+
+    # Files
+    def fetch(self, url: str, callback: Callable[[str | None], None]):
+        """Resolve `url` to a local file and call `callback(path)` on the main loop.
+
+        A cached copy is handed out immediately; if it is stale it is
+        revalidated in the background and `callback` runs again only when the
+        artwork actually changed. `path` is None if the download failed.
+        """
+        path = self.path_for(url)
+        only_if_changed = False
+        if os.path.isfile(path):
+            self._touch(path)
+            callback(path)
+            if not self._is_stale(path):
+                return
+            only_if_changed = True
+
+        with self._lock:
+            waiters = self._in_flight.setdefault(url, [])
+            waiters.append((callback, only_if_changed))
+            if len(waiters) > 1:
+                return  # Another thread is already fetching this URL
+        GLib.Thread.new("download-artwork", self._download, url)
+
+    def _is_stale(self, path: str) -> bool:
+        meta = self._read_meta(path)
+        return time.time() - meta.get("checked", 0) > REVALIDATE_AFTER
+
+    def _download(self, url: str):
+        path = self.path_for(url)
+        meta = self._read_meta(path) if os.path.isfile(path) else {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        result, changed = None, False
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                data = response.read()
+                meta = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+            tmp_path = f"{path}.part"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            result, changed = path, True
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and os.path.isfile(path):
+                result = path
+            else:
+                logger.warning(f"[Artwork] Failed to fetch {url}: {e}")
+        except Exception as e:
+            logger.warning(f"[Artwork] Failed to fetch {url}: {e}")
+
+        if result:
+            meta["checked"] = time.time()
+            self._write_meta(path, meta)
+            if changed:
+                self._enforce_limit()
+
+        with self._lock:
+            waiters = self._in_flight.pop(url, [])
+        for callback, only_if_changed in waiters:
+            if only_if_changed and not changed:
+                continue
+            GLib.idle_add(self._dispatch, callback, result)
+        return None
+
+    def _dispatch(self, callback, result):
+        callback(result)
+        return False
+
+    def _touch(self, path: str):
+        # mtime doubles as the LRU clock for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _read_meta(self, path: str) -> dict:
+        try:
+            with open(f"{path}.json", "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, path: str, meta: dict):
+        try:
+            with open(f"{path}.json", "w") as f:
+                json.dump(meta, f)
+        except OSError as e:
+            logger.warning(f"[Artwork] Failed to write cache metadata: {e}")
+
+    def _enforce_limit(self):
+        entries = []
+        total = 0
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                if not entry.is_file() or "." in entry.name:
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_bytes:
+                break
+            for victim in (path, f"{path}.json", f"{path}.palette.json"):
+                try:
+                    os.remove(victim)
+                except OSError:
+                    pass
+            total -= size
+
+
+_cache: ArtworkCache | None = None
+
+
+def get_artwork_cache() -> ArtworkCache:
+    """Get the process-wide artwork cache."""
+    global _cache
+    if _cache is None:
+        _cache = ArtworkCache()
+    return _cache
@@ -0,0 +1,73 @@
+"""
+Config hot-reload.
+
+The config file is watched; on change it is parsed and validated into a new
+`BarConfig`, which is diffed against the running one. Only the names of the
+changed top-level fields are emitted, so each bar can rebuild just the
+widgets and services they affect. An invalid file is logged and ignored, the
+running config stays in place.
+"""
+
+import os
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio
+from loguru import logger
+
+from bar.config import CONFIG_PATH, BarConfig, ConfigError, load_config, update_config
+
+
+WATCHED_EVENTS = (
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.CREATED,
+)
+
+
+class ConfigService(Service):
+    """Watches the config file and applies valid changes to the running config."""
+
+    @Signal
+    def changed(self, sections: object) -> None:
+        """Signal emitted with the set of changed top-level fields"""
+        pass
+
+    def __init__(self, config_path: str = CONFIG_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self._config_path = os.path.expanduser(config_path)
+        self._monitor = Gio.File.new_for_path(self._config_path).monitor_file(
+            Gio.FileMonitorFlags.NONE, None
+        )
+        self._monitor.connect("changed", self._on_file_changed)
+
+    def reload(self) -> set[str]:
+        """Re-read the config file; returns the fields that changed."""
+        try:
+            raw = load_config(self._config_path)
+            if raw is None:
+                raise ConfigError("file is empty or missing")
+            new = BarConfig.from_dict(raw)
+        except ConfigError as e:
+            logger.warning(f"[Config] Keeping running config, {self._config_path} is invalid: {e}")
+            return set()
+
+        sections = update_config(new)
+        if sections:
+            logger.info(f"[Config] Reloaded, changed: {', '.join(sorted(sections))}")
+            self.changed(sections)
+        return sections
+
+    def _on_file_changed(self, monitor, file, other_file, event):
+        if event not in WATCHED_EVENTS:
+            return
+        self.reload()
+
+
+_service: ConfigService | None = None
+
+
+def get_config_service() -> ConfigService:
+    """Get the process-wide config watcher."""
+    global _service
+    if _service is None:
+        _service = ConfigService()
+    return _service
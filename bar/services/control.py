@@ -0,0 +1,134 @@
+"""
+Control socket.
+
+The running bar listens on a unix socket in `$XDG_RUNTIME_DIR` (see
+`bar.msg`). Each connection carries one command line, e.g. `toggle calendar`,
+and gets one reply: `ok`, `ok <text>` or `error: <reason>`. Commands are
+registered by name and run on the main loop; reads are asynchronous so a slow
+client never blocks it.
+"""
+
+import inspect
+import os
+import socket
+from collections.abc import Callable
+
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from bar.msg import socket_path
+
+
+class ControlServer:
+    """Dispatches command lines from the control socket to registered handlers."""
+
+    def __init__(self, path: str | None = None):
+        self._path = path or socket_path()
+        self._commands: dict[str, Callable[..., str | None]] = {}
+        self._service: Gio.SocketService | None = None
+        self.register("help", lambda: " ".join(sorted(self._commands)))
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def register(self, name: str, handler: Callable[..., str | None]):
+        """Run `handler(*args)` for `name args...`; it may return reply text."""
+        self._commands[name] = handler
+
+    def start(self) -> bool:
+        if self._service is not None:
+            return True
+        if self._in_use():
+            logger.warning(f"[Control] {self._path} belongs to another running bar")
+            return False
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"[Control] Cannot remove stale {self._path}: {e}")
+            return False
+
+        service = Gio.SocketService.new()
+        try:
+            service.add_address(
+                Gio.UnixSocketAddress.new(self._path),
+                Gio.SocketType.STREAM,
+                Gio.SocketProtocol.DEFAULT,
+                None,
+            )
+        except GLib.Error as e:
+            logger.warning(f"[Control] Cannot listen on {self._path}: {e.message}")
+            return False
+        service.connect("incoming", self._on_incoming)
+        service.start()
+        self._service = service
+        logger.info(f"[Control] Listening on {self._path}")
+        return True
+
+    def stop(self):
+        if self._service is None:
+            return
+        self._service.stop()
+        self._service.close()
+        self._service = None
+        try:
+            os.unlink(self._path)
+        except OSError:
+            pass
+
+    def dispatch(self, line: str) -> str:
+        """The reply line for command `line`."""
+        name, *args = line.split() or [""]
+        handler = self._commands.get(name)
+        if handler is None:
+            return f"error: unknown command '{name}', try 'help'"
+        # Checked up front so a TypeError from the handler body is not
+        # mistaken for a usage error
+        try:
+            inspect.signature(handler).bind(*args)
+        except TypeError as e:
+            return f"error: bad arguments for '{name}': {e}"
+        try:
+            result = handler(*args)
+        except Exception as e:
+            logger.exception(f"[Control] '{line}' failed: {e}")
+            return f"error: {e}"
+        return f"ok {result}" if result else "ok"
+
+    def _in_use(self) -> bool:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self._path)
+            except OSError:
+                return False
+        return True
+
+    def _on_incoming(self, service, connection, source_object):
+        stream = Gio.DataInputStream.new(connection.get_input_stream())
+        stream.read_line_async(
+            GLib.PRIORITY_DEFAULT, None, self._on_line, connection
+        )
+        return True
+
+    def _on_line(self, stream, result, connection):
+        try:
+            line, _ = stream.read_line_finish_utf8(result)
+            reply = self.dispatch((line or "").strip())
+            connection.get_output_stream().write_all(f"{reply}\n".encode(), None)
+        except GLib.Error as e:
+            logger.warning(f"[Control] Connection failed: {e.message}")
+        finally:
+            connection.close(None)
+
+
+_server: ControlServer | None = None
+
+
+def get_control_server() -> ControlServer:
+    """Get the process-wide control server."""
+    global _server
+    if _server is None:
+        _server = ControlServer()
+    return _server
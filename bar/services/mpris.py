@@ -1,15 +1,18 @@
 # Standard library imports
 import contextlib
+from dataclasses import dataclass
 
 # Third-party imports
 import gi
-from gi.repository import GLib  # type: ignore
+from gi.repository import Gio, GLib  # type: ignore
 from loguru import logger
 
 # Fabric imports
 from fabric.core.service import Property, Service, Signal
 from fabric.utils import bulk_connect
 
+from bar.utils.profiler import profiler
+
 
 class PlayerctlImportError(ImportError):
     """An error to raise when playerctl is not installed."""
@@ -29,6 +32,53 @@ except ValueError:
     raise PlayerctlImportError
 
 
+# Minimum interval between seek commands sent to a player, in ms.
+SEEK_INTERVAL = 100
+
+
+@dataclass(frozen=True, slots=True)
+class TrackMetadata:
+    """An immutable, normalized snapshot of a player's mpris metadata."""
+
+    track_id: str | None = None
+    title: str = ""
+    artists: tuple[str, ...] = ()
+    album: str = ""
+    art_url: str | None = None
+    length: int = 0  # microseconds
+
+    @property
+    def artist(self) -> str:
+        return ", ".join(self.artists)
+
+    @classmethod
+    def from_variant(cls, variant) -> "TrackMetadata":
+        """Build a snapshot from the metadata `a{sv}` variant, unpacking it once."""
+        if variant is None:
+            return cls()
+        data = variant.unpack() if isinstance(variant, GLib.Variant) else variant
+        if not data:
+            return cls()
+
+        artists = data.get("xesam:artist") or ()
+        if isinstance(artists, str):
+            artists = (artists,)
+
+        try:
+            length = int(data.get("mpris:length") or 0)
+        except (TypeError, ValueError):
+            length = 0
+
+        return cls(
+            track_id=data.get("mpris:trackid") or None,
+            title=data.get("xesam:title") or "",
+            artists=tuple(a for a in artists if a),
+            album=data.get("xesam:album") or "",
+            art_url=data.get("mpris:artUrl") or None,
+            length=length,
+        )
+
+
 class MprisPlayer(Service):
     """A service to manage a mpris player."""
 
@@ -45,12 +95,36 @@ class MprisPlayer(Service):
     ):
         self._signal_connectors: dict = {}
         self._player: Playerctl.Player = player
+        self._track = TrackMetadata.from_variant(player.get_property("metadata"))
+        # Position is extrapolated locally from this anchor and only re-read
+        # over D-Bus on seeks, status and track changes.
+        self._position_anchor: int = 0
+        self._position_time: int = GLib.get_monotonic_time()
+        self._rate: float = 1.0
+        self._playing: bool = False
+        self._rate_proxy: Gio.DBusProxy | None = None
+        # Relative seeks waiting to be merged into one `Seek`
+        self._pending_seek: int = 0
+        self._seek_timer: int | None = None
+        # Latest scrub target not yet sent as `SetPosition`
+        self._pending_position: int | None = None
+        self._scrub_timer: int | None = None
+        self._exited = False
         super().__init__(**kwargs)
-        for sn in ["playback-status", "loop-status", "shuffle", "volume", "seeked"]:
+        self._sync_position()
+        for sn in ["loop-status", "shuffle", "volume"]:
             self._signal_connectors[sn] = self._player.connect(
                 sn,
                 lambda *args, sn=sn: self.notifier(sn, args),
             )
+        self._signal_connectors["playback-status"] = self._player.connect(
+            "playback-status",
+            self.on_playback_status,
+        )
+        self._signal_connectors["seeked"] = self._player.connect(
+            "seeked",
+            self.on_seeked,
+        )
 
         self._signal_connectors["exit"] = self._player.connect(
             "exit",
@@ -58,9 +132,88 @@ class MprisPlayer(Service):
         )
         self._signal_connectors["metadata"] = self._player.connect(
             "metadata",
-            lambda *args: self.update_status(),
+            self.on_metadata,
         )
         GLib.idle_add(lambda *args: self.update_status_once())
+        self._watch_rate()
+
+    def on_metadata(self, player, metadata):
+        self._track = TrackMetadata.from_variant(metadata)
+        self._sync_position()
+        self.update_status()
+
+    def on_playback_status(self, player, status):
+        self._sync_position()
+        self.notifier("playback-status")
+
+    def on_seeked(self, player, position: int):
+        # While seeks are still being sent, `Seeked` reports a position the
+        # local one has already moved past.
+        if self._seek_timer is None and self._scrub_timer is None:
+            self._sync_position(position)
+        self.notifier("seeked")
+
+    def _sync_position(self, position: int | None = None):
+        """Re-anchor the locally extrapolated position.
+
+        Reads the position over D-Bus unless the caller already has it
+        (e.g. from a `Seeked` signal).
+        """
+        if position is None:
+            try:
+                position = self._player.get_property("position")
+            except Exception:
+                position = self.position
+        self._position_anchor = int(position or 0)
+        self._position_time = GLib.get_monotonic_time()
+        self._playing = (
+            self._player.get_property("playback_status")
+            == Playerctl.PlaybackStatus.PLAYING
+        )
+
+    def _watch_rate(self):
+        # Playerctl does not expose `Rate`; a property-caching proxy keeps it
+        # current from `PropertiesChanged` without any polling.
+        instance = self._player.get_property("player-instance")
+        if not instance:
+            return
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SESSION,
+            Gio.DBusProxyFlags.DO_NOT_AUTO_START,
+            None,
+            f"org.mpris.MediaPlayer2.{instance}",
+            "/org/mpris/MediaPlayer2",
+            "org.mpris.MediaPlayer2.Player",
+            None,
+            self._on_rate_proxy_ready,
+        )
+
+    def _on_rate_proxy_ready(self, source, result):
+        try:
+            proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except GLib.Error as e:
+            logger.debug(f"[MprisPlayer] Rate unavailable: {e.message}")
+            return
+        if self._exited:
+            return
+        self._rate_proxy = proxy
+        self._update_rate()
+        self._rate_proxy.connect(
+            "g-properties-changed",
+            lambda proxy, changed, invalidated: self._update_rate()
+            if "Rate" in changed.keys()
+            else None,
+        )
+
+    def _update_rate(self):
+        rate = self._rate_proxy.get_cached_property("Rate") if self._rate_proxy else None
+        rate = rate.unpack() if rate is not None else 1.0
+        if rate == self._rate:
+            return
+        # Fold the time elapsed at the old rate into the anchor first.
+        self._position_anchor = self.position
+        self._position_time = GLib.get_monotonic_time()
+        self._rate = rate
 
     def update_status(self):
         # schedule each notifier asynchronously.
@@ -102,11 +255,30 @@ class MprisPlayer(Service):
 
         GLib.idle_add(notify_and_emit, priority=GLib.PRIORITY_DEFAULT_IDLE)
 
-    def on_player_exit(self, player):
+    def release(self):
+        """Disconnect from the Playerctl player and drop pending work.
+
+        Called when nothing shows this player any more, and on exit.
+        """
+        if self._exited:
+            return
+        self._exited = True
+        # Pending seeks and scrubs would reach for the player after it is gone
+        for timer in (self._seek_timer, self._scrub_timer):
+            if timer is not None:
+                GLib.source_remove(timer)
+        self._seek_timer = None
+        self._scrub_timer = None
+        self._pending_seek = 0
+        self._pending_position = None
         for id in list(self._signal_connectors.values()):
             with contextlib.suppress(Exception):
                 self._player.disconnect(id)
-        del self._signal_connectors
+        self._signal_connectors = {}
+        self._rate_proxy = None
+
+    def on_player_exit(self, player):
+        self.release()
         GLib.idle_add(lambda: (self.emit("exit", True), False))
         del self._player
 
@@ -124,6 +296,53 @@ class MprisPlayer(Service):
         if self.can_go_next:
             GLib.idle_add(lambda: (self._player.next(), False))
 
+    def seek(self, offset: int):
+        """Seek by `offset` µs.
+
+        Calls within `SEEK_INTERVAL` of each other are merged into a single
+        relative `Seek`; the local position moves immediately.
+        """
+        self._move_anchor(self.position + offset)
+        self._pending_seek += offset
+        if self._seek_timer is None:
+            self._seek_timer = GLib.timeout_add(SEEK_INTERVAL, self._flush_seek)
+
+    def _flush_seek(self):
+        self._seek_timer = None
+        offset, self._pending_seek = self._pending_seek, 0
+        if offset:
+            self._player.seek(offset)
+        return False
+
+    def scrub_to(self, position: int):
+        """Move to `position` µs while dragging.
+
+        Sends at most one `SetPosition` per `SEEK_INTERVAL`, always ending on
+        the latest target; the local position follows every call.
+        """
+        self._move_anchor(position)
+        self._pending_position = self._position_anchor
+        if self._scrub_timer is None:
+            self._send_scrub_position()
+            self._scrub_timer = GLib.timeout_add(SEEK_INTERVAL, self._on_scrub_interval)
+
+    def _on_scrub_interval(self):
+        if self._pending_position is not None:
+            self._send_scrub_position()
+            return True
+        self._scrub_timer = None
+        return False
+
+    def _send_scrub_position(self):
+        position, self._pending_position = self._pending_position, None
+        self._player.set_position(position)
+
+    def _move_anchor(self, position: int):
+        length = self._track.length
+        position = max(0, min(position, length) if length else position)
+        self._position_anchor = position
+        self._position_time = GLib.get_monotonic_time()
+
     def previous(self):
         if self.can_go_previous:
             GLib.idle_add(lambda: (self._player.previous(), False))
@@ -133,44 +352,48 @@ class MprisPlayer(Service):
     def player_name(self) -> int:
         return self._player.get_property("player-name")  # type: ignore
 
+    @Property(str, "readable")
+    def player_instance(self) -> str:
+        return self._player.get_property("player-instance")  # type: ignore
+
     @Property(int, "read-write", default_value=0)
     def position(self) -> int:
-        return self._player.get_property("position")  # type: ignore
+        if not self._playing:
+            return self._position_anchor
+        elapsed = GLib.get_monotonic_time() - self._position_time
+        position = self._position_anchor + int(elapsed * self._rate)
+        length = self._track.length
+        return min(position, length) if length else position
 
     @position.setter
     def position(self, new_pos: int):
         self._player.set_position(new_pos)
+        # Optimistic; corrected by the `Seeked` signal if the player clamps it.
+        self._move_anchor(new_pos)
 
     @Property(object, "readable")
-    def metadata(self) -> dict:
-        return self._player.get_property("metadata")  # type: ignore
+    def metadata(self) -> TrackMetadata:
+        return self._track
 
     @Property(str or None, "readable")
     def arturl(self) -> str | None:
-        if "mpris:artUrl" in self.metadata.keys():  # type: ignore  # noqa: SIM118
-            return self.metadata["mpris:artUrl"]  # type: ignore
-        return None
+        return self._track.art_url
 
-    @Property(str or None, "readable")
-    def length(self) -> str | None:
-        if "mpris:length" in self.metadata.keys():  # type: ignore  # noqa: SIM118
-            return self.metadata["mpris:length"]  # type: ignore
-        return None
+    @Property(object, "readable")
+    def length(self) -> int | None:
+        return self._track.length or None
 
     @Property(str, "readable")
     def artist(self) -> str:
-        artist = self._player.get_artist()  # type: ignore
-        if isinstance(artist, (list, tuple)):
-            return ", ".join(artist)
-        return artist
+        return self._track.artist
 
     @Property(str, "readable")
     def album(self) -> str:
-        return self._player.get_album()  # type: ignore
+        return self._track.album
 
     @Property(str, "readable")
     def title(self):
-        return self._player.get_title()
+        return self._track.title
 
     @Property(bool, "read-write", default_value=False)
     def shuffle(self) -> bool:
@@ -246,7 +469,7 @@ class MprisPlayerManager(Service):
     def player_appeared(self, player: Playerctl.Player) -> Playerctl.Player: ...
 
     @Signal
-    def player_vanished(self, player_name: str) -> str: ...
+    def player_vanished(self, player_instance: str) -> str: ...
 
     def __init__(
         self,
@@ -260,7 +483,8 @@ class MprisPlayerManager(Service):
                 "name-vanished": self.on_name_vanished,
             },
         )
-        self.add_players()
+        with profiler.phase("MprisPlayerManager initial players"):
+            self.add_players()
         super().__init__(**kwargs)
 
     def on_name_appeard(self, manager, player_name: Playerctl.PlayerName):
@@ -270,8 +494,8 @@ class MprisPlayerManager(Service):
         self.emit("player-appeared", new_player)  # type: ignore
 
     def on_name_vanished(self, manager, player_name: Playerctl.PlayerName):
-        logger.info(f"[MprisPlayer] {player_name.name} vanished")
-        self.emit("player-vanished", player_name.name)  # type: ignore
+        logger.info(f"[MprisPlayer] {player_name.instance} vanished")
+        self.emit("player-vanished", player_name.instance)  # type: ignore
 
     def add_players(self):
         for player in self._manager.get_property("player-names"):  # type: ignore
@@ -0,0 +1,215 @@
+"""
+Accent colors from the current album art.
+
+The dominant colors of a cover are found once per artwork (k-means over a
+downsampled copy of its pixels, vectorized with NumPy, on a worker thread),
+cached next to the artwork cache and applied through a single CSS provider
+whose contents are replaced on every track change.
+"""
+
+import json
+import os
+
+from gi.repository import Gdk, GdkPixbuf, GLib, Gtk
+from loguru import logger
+
+from bar.services.artwork import ARTWORK_CACHE_DIR, ArtworkCache
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logger.info("[Palette] numpy not available, album art palette disabled")
+
+
+SAMPLE_SIZE = 48  # Covers are downsampled to this many pixels per side
+PALETTE_SIZE = 5
+KMEANS_ITERATIONS = 8
+
+PALETTE_CSS = """
+@define-color album_dominant {dominant};
+@define-color album_accent {accent};
+
+#bar-inner {{
+    border-color: alpha(@album_accent, 0.6);
+}}
+
+#player-progress,
+#player-switcher-button.active,
+#compact-mpris-icon-label,
+#cavalcade {{
+    color: @album_accent;
+}}
+"""
+
+
+def extract_palette(
+    pixels: bytes,
+    width: int,
+    height: int,
+    rowstride: int,
+    n_channels: int,
+    count: int = PALETTE_SIZE,
+) -> list[tuple[list[int], float]]:
+    """Cluster the pixels into `count` colors, most common first.
+
+    Returns `(rgb, share)` pairs where `share` is the fraction of pixels
+    closest to that color.
+    """
+    data = np.frombuffer(pixels, dtype=np.uint8)
+    # The last row of a pixbuf is not padded to the full rowstride
+    data = np.pad(data, (0, rowstride * height - data.size))
+    rgb = (
+        data.reshape(height, rowstride)[:, : width * n_channels]
+        .reshape(-1, n_channels)[:, :3]
+        .astype(np.float32)
+    )
+
+    # Deterministic start: evenly spaced pixels along the luminance order
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    order = np.argsort(luma)
+    centers = rgb[order[np.linspace(0, len(order) - 1, count).astype(int)]]
+
+    for _ in range(KMEANS_ITERATIONS):
+        distances = ((rgb[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=count)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, rgb)
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, None]
+
+    ranked = np.argsort(-counts)
+    return [
+        (centers[i].round().astype(int).tolist(), float(counts[i] / len(rgb)))
+        for i in ranked
+        if counts[i]
+    ]
+
+
+def _to_hex(rgb: list[int]) -> str:
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def _pick_roles(palette: list[tuple[list[int], float]]) -> dict[str, str]:
+    """Choose the dominant color and the most vivid reasonably common one."""
+    dominant = palette[0][0]
+
+    def vividness(entry):
+        rgb, share = entry
+        saturation = (max(rgb) - min(rgb)) / 255
+        return saturation * min(share * 4, 1.0)
+
+    accent = max(palette, key=vividness)[0]
+    return {"dominant": _to_hex(dominant), "accent": _to_hex(accent)}
+
+
+class PaletteService:
+    """Themes the bar and player accents from the visible cover art."""
+
+    def __init__(self, cache_dir: str = ARTWORK_CACHE_DIR):
+        self._cache_dir = cache_dir
+        self._provider = Gtk.CssProvider()
+        self._memory: dict[str, dict[str, str]] = {}
+        self._current_key: str | None = None
+        Gtk.StyleContext.add_provider_for_screen(
+            Gdk.Screen.get_default(),
+            self._provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_USER,
+        )
+
+    def apply(self, arturl: str, pixbuf: GdkPixbuf.Pixbuf):
+        """Theme from the cover `pixbuf` that was loaded for `arturl`."""
+        if not NUMPY_AVAILABLE:
+            return
+        key = ArtworkCache.key_for(arturl)
+        if key == self._current_key:
+            return
+        self._current_key = key
+
+        roles = self._memory.get(key) or self._read(key)
+        if roles:
+            self._memory[key] = roles
+            self._load_css(roles)
+            return
+
+        # Downsampling is cheap next to decoding and keeps the worker's input tiny
+        sample = pixbuf.scale_simple(
+            SAMPLE_SIZE, SAMPLE_SIZE, GdkPixbuf.InterpType.TILES
+        )
+        args = (
+            sample.get_pixels(),
+            sample.get_width(),
+            sample.get_height(),
+            sample.get_rowstride(),
+            sample.get_n_channels(),
+        )
+        GLib.Thread.new("extract-palette", lambda *_: self._extract(key, args), None)
+
+    def restore(self, arturl: str) -> bool:
+        """Theme from the palette cached for `arturl`, without its pixbuf.
+
+        Returns False if no palette was extracted for it yet.
+        """
+        key = ArtworkCache.key_for(arturl)
+        roles = self._memory.get(key) or self._read(key)
+        if not roles:
+            return False
+        self._current_key = key
+        self._memory[key] = roles
+        self._load_css(roles)
+        return True
+
+    def clear(self):
+        """Fall back to the regular theme colors."""
+        self._current_key = None
+        self._provider.load_from_data(b"")
+
+    def _extract(self, key: str, args: tuple):
+        try:
+            roles = _pick_roles(extract_palette(*args))
+        except Exception as e:
+            logger.warning(f"[Palette] Failed to extract palette: {e}")
+            return None
+        self._write(key, roles)
+        GLib.idle_add(self._finish_extract, key, roles)
+        return None
+
+    def _finish_extract(self, key: str, roles: dict[str, str]):
+        self._memory[key] = roles
+        if key == self._current_key:
+            self._load_css(roles)
+        return False
+
+    def _load_css(self, roles: dict[str, str]):
+        self._provider.load_from_data(PALETTE_CSS.format(**roles).encode())
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.palette.json")
+
+    def _read(self, key: str) -> dict[str, str] | None:
+        try:
+            with open(self._path_for(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, roles: dict[str, str]):
+        try:
+            with open(self._path_for(key), "w") as f:
+                json.dump(roles, f)
+        except OSError as e:
+            logger.warning(f"[Palette] Failed to cache palette: {e}")
+
+
+_service: PaletteService | None = None
+
+
+def get_palette_service() -> PaletteService:
+    """Get the process-wide palette service."""
+    global _service
+    if _service is None:
+        _service = PaletteService()
+    return _service
@@ -0,0 +1,109 @@
+"""
+Warm-state snapshot.
+
+The last known state of the bar's services (calendar events, unread count,
+visible player with its track and artwork, workspace layout) is kept in one
+small JSON file in the XDG state dir. It is read at startup so widgets can
+show those values immediately, and the live services overwrite them as their
+data arrives. Sections are filled by providers registered by their owners and
+are written periodically and at shutdown, only when something changed.
+"""
+
+import json
+import os
+from collections.abc import Callable
+
+from gi.repository import GLib
+from loguru import logger
+from platformdirs import user_state_dir
+
+from bar.config import APP_NAME
+
+
+SNAPSHOT_PATH = os.path.join(user_state_dir(appname=APP_NAME), "snapshot.json")
+SNAPSHOT_VERSION = 1
+SAVE_INTERVAL = 60  # seconds
+
+
+class StateSnapshot:
+    """Sections of last known service state, restored on restart."""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self._path = path
+        self._sections: dict = self._read()
+        self._providers: dict[str, Callable[[], object]] = {}
+        self._written: str | None = None
+        self._timer_id = None
+
+    def get(self, section: str, default=None):
+        """State saved for `section` by the previous run."""
+        return self._sections.get(section, default)
+
+    def register(self, section: str, provider: Callable[[], object]):
+        """Save `provider()`, a JSON-serializable value, as `section`."""
+        self._providers[section] = provider
+
+    def unregister(self, section: str, provider: Callable[[], object]):
+        """Stop saving `section`, if `provider` still owns it; its last state is kept."""
+        if self._providers.get(section) == provider:
+            try:
+                self._sections[section] = provider()
+            except Exception as e:
+                logger.warning(f"[Snapshot] Failed to collect {section}: {e}")
+            del self._providers[section]
+
+    def start(self, interval: int = SAVE_INTERVAL):
+        """Save periodically, so a crash loses at most `interval` seconds."""
+        if self._timer_id is None:
+            self._timer_id = GLib.timeout_add_seconds(interval, self._on_interval)
+
+    def save(self):
+        for section, provider in self._providers.items():
+            try:
+                self._sections[section] = provider()
+            except Exception as e:
+                logger.warning(f"[Snapshot] Failed to collect {section}: {e}")
+
+        data = json.dumps(
+            {"version": SNAPSHOT_VERSION, "sections": self._sections},
+            separators=(",", ":"),
+        )
+        if data == self._written:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = f"{self._path}.part"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path)
+            self._written = data
+        except OSError as e:
+            logger.warning(f"[Snapshot] Failed to write {self._path}: {e}")
+
+    def _on_interval(self):
+        self.save()
+        return True
+
+    def _read(self) -> dict:
+        try:
+            with open(self._path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Snapshot] Ignoring unreadable {self._path}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return {}
+        return data.get("sections", {})
+
+
+_snapshot: StateSnapshot | None = None
+
+
+def get_snapshot() -> StateSnapshot:
+    """Get the process-wide state snapshot."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = StateSnapshot()
+    return _snapshot
@@ -0,0 +1,104 @@
+"""
+Live Stylix colors.
+
+The base16 palette lives in its own small CSS provider of `@define-color`
+rules. It follows `stylix` changes from the config watcher and watches the
+optional base16 scheme file itself, and when the resolved colors change only
+that provider is reloaded; the structural stylesheets stay parsed.
+"""
+
+import os
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gdk, Gio, Gtk
+from loguru import logger
+
+from bar.config import STYLIX
+from bar.modules.stylix import render_palette_css, resolve_colors
+from bar.services.config import get_config_service
+
+
+WATCHED_EVENTS = (
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.CREATED,
+)
+
+
+class ThemeService(Service):
+    """Owns the swappable Stylix color provider."""
+
+    @Signal
+    def changed(self) -> None:
+        """Signal emitted after new colors were applied"""
+        pass
+
+    def __init__(self, stylix: dict = STYLIX, **kwargs):
+        super().__init__(**kwargs)
+        self._stylix = stylix
+        self._colors: dict | None = None
+        self._monitors: dict[str, Gio.FileMonitor] = {}
+        self._provider = Gtk.CssProvider()
+        Gtk.StyleContext.add_provider_for_screen(
+            Gdk.Screen.get_default(),
+            self._provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
+        )
+        get_config_service().connect("changed", self._on_config_changed)
+        self._apply(stylix)
+
+    @property
+    def colors(self) -> dict:
+        return dict(self._colors or {})
+
+    def reload(self):
+        """Re-read the scheme file and apply the colors."""
+        self._apply(self._stylix)
+
+    def _on_config_changed(self, _, sections):
+        if "stylix" in sections:
+            self.reload()
+
+    def _apply(self, stylix: dict):
+        self._watch_only(stylix.get("scheme"))
+
+        colors = resolve_colors(stylix)
+        if colors == self._colors:
+            return
+        self._colors = colors
+        self._provider.load_from_data(render_palette_css(colors).encode())
+        logger.info("[Theme] Applied Stylix colors")
+        self.changed()
+
+    def _watch_only(self, *paths: str | None):
+        wanted = {os.path.expanduser(path) for path in paths if path}
+        for path in set(self._monitors) - wanted:
+            self._monitors.pop(path).cancel()
+        for path in wanted:
+            self._watch(path)
+
+    def _watch(self, path: str):
+        path = os.path.expanduser(path)
+        if path in self._monitors:
+            return
+        monitor = Gio.File.new_for_path(path).monitor_file(
+            Gio.FileMonitorFlags.NONE, None
+        )
+        monitor.connect("changed", self._on_file_changed)
+        self._monitors[path] = monitor
+
+    def _on_file_changed(self, monitor, file, other_file, event):
+        if event not in WATCHED_EVENTS:
+            return
+        logger.info(f"[Theme] {file.get_path()} changed, reloading colors")
+        self.reload()
+
+
+_service: ThemeService | None = None
+
+
+def get_theme_service() -> ThemeService:
+    """Get the process-wide theme service."""
+    global _service
+    if _service is None:
+        _service = ThemeService()
+    return _service
@@ -0,0 +1,109 @@
+"""
+Wallpaper fallback artwork.
+
+Watches the wallpaper once for the whole process and keeps it decoded at the
+sizes it has been requested at, so player boxes falling back to it neither
+re-decode the file nor add file monitors of their own.
+"""
+
+import os
+from collections.abc import Callable
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from bar.widgets.circle_image import load_square_pixbuf
+
+
+WALLPAPER_PATH = os.path.expanduser("~/Pictures/wallpaper/background.jpg")
+
+
+class WallpaperService(Service):
+    """Shared, watched and decoded wallpaper."""
+
+    @Signal
+    def changed(self) -> None:
+        """Signal emitted when the wallpaper file changes"""
+        pass
+
+    def __init__(self, path: str = WALLPAPER_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self._path = path
+        self._pixbufs: dict = {}
+        self._generation = 0  # Bumped on change so stale decodes are not cached
+        # (size, generation) -> callbacks waiting on a decode in progress
+        self._pending: dict[tuple[int, int], list[Callable]] = {}
+        self._monitor = Gio.File.new_for_path(path).monitor_file(
+            Gio.FileMonitorFlags.NONE, None
+        )
+        self._monitor.connect("changed", self._on_file_changed)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def load(self, size: int, callback: Callable):
+        """Call `callback(pixbuf)` with the wallpaper as a `size`×`size` square.
+
+        Decoding happens once per size on a worker thread; later calls are
+        answered from memory.
+        """
+        pixbuf = self._pixbufs.get(size)
+        if pixbuf is not None:
+            callback(pixbuf)
+            return
+
+        generation = self._generation
+        waiters = self._pending.setdefault((size, generation), [])
+        waiters.append(callback)
+        if len(waiters) > 1:
+            return
+        GLib.Thread.new(
+            "decode-wallpaper", lambda *_: self._decode(size, generation), None
+        )
+
+    def _decode(self, size: int, generation: int):
+        try:
+            pixbuf = load_square_pixbuf(self._path, size)
+        except GLib.Error as e:
+            logger.warning(f"[Wallpaper] Failed to load {self._path}: {e}")
+            pixbuf = None
+        GLib.idle_add(self._finish_decode, size, generation, pixbuf)
+        return None
+
+    def _finish_decode(self, size: int, generation: int, pixbuf):
+        waiters = self._pending.pop((size, generation), [])
+        if generation != self._generation:
+            # The file changed while decoding; decode the new one instead
+            for callback in waiters:
+                self.load(size, callback)
+            return False
+        if pixbuf is not None:
+            self._pixbufs[size] = pixbuf
+            for callback in waiters:
+                callback(pixbuf)
+        return False
+
+    def _on_file_changed(self, monitor, file, other_file, event):
+        if event not in (
+            Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+            Gio.FileMonitorEvent.CREATED,
+            Gio.FileMonitorEvent.DELETED,
+        ):
+            return
+        logger.info("[Wallpaper] Wallpaper changed")
+        self._generation += 1
+        self._pixbufs.clear()
+        self.changed()
+
+
+_service: WallpaperService | None = None
+
+
+def get_wallpaper_service() -> WallpaperService:
+    """Get the process-wide wallpaper service."""
+    global _service
+    if _service is None:
+        _service = WallpaperService()
+    return _service
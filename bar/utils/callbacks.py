@@ -0,0 +1,182 @@
+"""
+Per-callback main-loop time accounting.
+
+Enabled with `--profile-callbacks`. GLib idle and timeout sources, frame
+clock tick callbacks and every GObject signal handler (fabric `Signal`s, I3
+`event::...` handlers, GTK widget signals) added after `install()` are
+wrapped to record call counts and cumulative and maximum durations, keyed
+by the callback's qualified name and what dispatched it. Handlers of
+signals emitted from inside another callback are counted in both. The
+numbers are exported on demand (`bar msg callbacks`,
+`bar msg callbacks chrome`) and as a table at exit.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+
+
+# Bounds the memory of the Chrome trace; the table keeps every call
+MAX_TRACE_EVENTS = 200_000
+
+
+def _requested() -> bool:
+    return "--profile-callbacks" in sys.argv[1:]
+
+
+def callback_name(callback) -> str:
+    """`module.Class.method` for a callback, with the location of lambdas."""
+    func = getattr(callback, "__func__", callback)
+    qualname = getattr(func, "__qualname__", None) or repr(func)
+    module = getattr(func, "__module__", None) or "?"
+    code = getattr(func, "__code__", None)
+    if "<lambda>" in qualname and code is not None:
+        return f"{module}.{qualname} (line {code.co_firstlineno})"
+    return f"{module}.{qualname}"
+
+
+class TimedCallback:
+    """A callback that records its duration.
+
+    Compares equal to the wrapped callback, so `disconnect_by_func` and
+    `handler_block_by_func` (which look handlers up by equality) still find it.
+    """
+
+    __slots__ = ("callback", "key", "stats")
+
+    def __init__(self, stats: "CallbackStats", kind: str, callback):
+        self.callback = callback
+        self.key = (kind, callback_name(callback))
+        self.stats = stats
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.callback(*args, **kwargs)
+        finally:
+            self.stats._record(self.key, start, time.perf_counter() - start)
+
+    def __eq__(self, other):
+        if isinstance(other, TimedCallback):
+            other = other.callback
+        return self.callback == other
+
+    def __hash__(self):
+        return hash(self.callback)
+
+
+class CallbackStats:
+    """Call count, total and maximum duration per (source kind, callback)."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._installed = False
+        self._start = time.perf_counter()
+        # (kind, name) -> [calls, total seconds, max seconds]
+        self._stats: dict[tuple[str, str], list] = {}
+        self._events: deque = deque(maxlen=MAX_TRACE_EVENTS)
+
+    def install(self):
+        """Wrap GLib sources and GObject signal handlers from now on."""
+        if not self.enabled or self._installed:
+            return
+        import gi
+
+        gi.require_version("Gtk", "3.0")
+        from gi.repository import GLib, GObject, Gtk
+
+        self._installed = True
+        for name in ("idle_add", "timeout_add", "timeout_add_seconds"):
+            setattr(GLib, name, self._wrap_source(name, getattr(GLib, name)))
+        Gtk.Widget.add_tick_callback = self._wrap_source(
+            "tick", Gtk.Widget.add_tick_callback
+        )
+        for name in ("connect", "connect_after"):
+            setattr(GObject.Object, name, self._wrap_connect(getattr(GObject.Object, name)))
+
+    def reset(self):
+        self._stats.clear()
+        self._events.clear()
+        self._start = time.perf_counter()
+
+    def timed(self, kind: str, callback) -> TimedCallback:
+        """`callback` wrapped to record its duration under `kind`."""
+        return TimedCallback(self, kind, callback)
+
+    def _record(self, key: tuple[str, str], start: float, duration: float):
+        entry = self._stats.get(key)
+        if entry is None:
+            entry = self._stats[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += duration
+        if duration > entry[2]:
+            entry[2] = duration
+        self._events.append((key, start, duration))
+
+    def _wrap_source(self, kind: str, add_source):
+        kind = kind.removesuffix("_add")
+        # Works for methods too: the widget is not callable, the callback is
+
+        def patched(*args, **kwargs):
+            args = list(args)
+            index = next((i for i, arg in enumerate(args) if callable(arg)), None)
+            if index is not None:
+                args[index] = self.timed(kind, args[index])
+            return add_source(*args, **kwargs)
+
+        return patched
+
+    def _wrap_connect(self, connect):
+        stats = self
+
+        def patched(obj, signal_name, handler, *args):
+            if callable(handler):
+                handler = stats.timed(f"signal {signal_name}", handler)
+            return connect(obj, signal_name, handler, *args)
+
+        return patched
+
+    def table(self, limit: int = 40) -> str:
+        """The most expensive callbacks by cumulative time."""
+        elapsed = max(time.perf_counter() - self._start, 1e-9)
+        rows = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)
+        busy = sum(entry[1] for _, entry in rows)
+        lines = [
+            f"[Callbacks] {busy * 1000:.1f}ms in callbacks over {elapsed:.1f}s ({busy / elapsed:.1%} of wall time)",
+            f"[Callbacks] {'callback':<60} {'source':<30} {'calls':>7} {'total ms':>9} {'max ms':>8} {'mean ms':>8}",
+        ]
+        for (kind, name), (calls, total, longest) in rows[:limit]:
+            lines.append(
+                f"[Callbacks] {name[-60:]:<60} {kind[:30]:<30} {calls:>7} {total * 1000:>9.1f}"
+                f" {longest * 1000:>8.2f} {total / calls * 1000:>8.3f}"
+            )
+        return "\n".join(lines)
+
+    def write_chrome_trace(self) -> str:
+        """Write the recorded calls as Chrome trace events; returns the path."""
+        from platformdirs import user_cache_dir
+
+        from bar.config import APP_NAME
+
+        events = [
+            {
+                "name": name,
+                "cat": kind,
+                "ph": "X",
+                "ts": (start - self._start) * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": 1,
+            }
+            for (kind, name), start, duration in list(self._events)
+        ]
+        path = os.path.join(user_cache_dir(appname=APP_NAME), "callbacks-trace.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+callback_stats = CallbackStats(enabled=_requested())
@@ -0,0 +1,36 @@
+"""
+Frame-clock helpers.
+"""
+
+from collections.abc import Callable
+
+from gi.repository import GLib, Gtk
+
+
+def after_first_frame(widget: Gtk.Widget, callback: Callable[[], None]):
+    """Call `callback()` once, from the main loop, after `widget` first painted.
+
+    Used to keep data loads out of the way of the first frame of a window.
+    """
+    handlers = {}
+
+    def run():
+        callback()
+        return False
+
+    def on_after_paint(clock):
+        clock.disconnect(handlers.pop("paint"))
+        GLib.idle_add(run)
+
+    def watch(clock):
+        handlers["paint"] = clock.connect("after-paint", on_after_paint)
+
+    def on_realize(*_):
+        widget.disconnect(handlers.pop("realize"))
+        watch(widget.get_frame_clock())
+
+    clock = widget.get_frame_clock() if widget.get_realized() else None
+    if clock is not None:
+        watch(clock)
+    else:
+        handlers["realize"] = widget.connect("realize", on_realize)
@@ -0,0 +1,139 @@
+"""
+Startup phase profiler.
+
+Enabled with `--profile-startup` (text report on stderr) or
+`--profile-startup=chrome` (Chrome trace JSON, viewable in chrome://tracing or
+Perfetto). It is imported before anything else so the config load and the
+fabric/GTK imports are covered, and it only reads `sys.argv` for that reason.
+When disabled, `phase()` costs a single attribute check.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Imported first by bar.main, so this is as close to process start as we get
+_PROCESS_START = time.perf_counter()
+_PROCESS_START_CPU = time.process_time()
+
+
+def _requested_format() -> str | None:
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        if arg == "--profile-startup":
+            following = args[i + 1] if i + 1 < len(args) else None
+            return following if following in ("text", "chrome") else "text"
+        if arg.startswith("--profile-startup="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+class StartupProfiler:
+    """Records wall-clock and CPU time of nested startup phases."""
+
+    def __init__(self, output_format: str | None = None):
+        self.enabled = output_format is not None
+        self._format = output_format or "text"
+        self._records: list[dict] = []
+        self._open: dict[str, tuple] = {}
+        self._depth = 0
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as phase `name`."""
+        if not self.enabled:
+            yield
+            return
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def begin(self, name: str):
+        """Start phase `name`, for phases that end in a later callback."""
+        if not self.enabled:
+            return
+        self._open[name] = (time.perf_counter(), time.process_time(), self._depth)
+        self._depth += 1
+
+    def end(self, name: str):
+        if not self.enabled or name not in self._open:
+            return
+        start, cpu_start, depth = self._open.pop(name)
+        self._depth = max(0, self._depth - 1)
+        self._records.append(
+            {
+                "name": name,
+                "start": start - _PROCESS_START,
+                "wall": time.perf_counter() - start,
+                "cpu": time.process_time() - cpu_start,
+                "depth": depth,
+            }
+        )
+
+    def report(self):
+        """Write the report once; call after the first frame was presented."""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        for name in list(self._open):
+            self.end(name)
+        total = time.perf_counter() - _PROCESS_START
+        total_cpu = time.process_time() - _PROCESS_START_CPU
+        records = sorted(self._records, key=lambda r: r["start"])
+
+        if self._format == "chrome":
+            self._write_chrome_trace(records)
+        else:
+            self._print_text(records, total, total_cpu)
+
+    def _print_text(self, records: list[dict], total: float, total_cpu: float):
+        lines = [
+            "[Startup] phase                                  start ms   wall ms    cpu ms   share",
+        ]
+        for r in records:
+            label = f"{'  ' * r['depth']}{r['name']}"
+            lines.append(
+                f"[Startup] {label:<40} {r['start'] * 1000:>8.1f}  {r['wall'] * 1000:>8.1f}"
+                f"  {r['cpu'] * 1000:>8.1f}  {r['wall'] / total:>6.1%}"
+            )
+        lines.append(
+            f"[Startup] {'total (to first frame)':<40} {'':>8}  {total * 1000:>8.1f}  {total_cpu * 1000:>8.1f}"
+        )
+        top = [r for r in records if r["depth"] == 0]
+        if top:
+            dominant = max(top, key=lambda r: r["wall"])
+            lines.append(
+                f"[Startup] dominant phase: {dominant['name']} ({dominant['wall'] / total:.0%} of startup)"
+            )
+        print("\n".join(lines), file=sys.stderr)
+
+    def _write_chrome_trace(self, records: list[dict]):
+        from platformdirs import user_cache_dir
+
+        from bar.config import APP_NAME
+
+        events = [
+            {
+                "name": r["name"],
+                "ph": "X",
+                "ts": r["start"] * 1e6,
+                "dur": r["wall"] * 1e6,
+                "pid": os.getpid(),
+                "tid": 1,
+                "args": {"cpu_ms": round(r["cpu"] * 1000, 3)},
+            }
+            for r in records
+        ]
+        path = os.path.join(user_cache_dir(appname=APP_NAME), "startup-trace.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"[Startup] Chrome trace written to {path}", file=sys.stderr)
+
+
+profiler = StartupProfiler(_requested_format())
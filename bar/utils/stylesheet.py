@@ -0,0 +1,235 @@
+"""
+Stylesheet bundler.
+
+Flattens the `@import`s of a stylesheet into one file, strips comments and
+whitespace, and caches the result in the XDG cache dir keyed by the
+modification times of the imported stylesheets. GTK then parses one small
+file at startup.
+
+With `prune=True` (`stylesheet: {prune: true}` in the config) selectors are
+also dropped when they name an id or class that appears in no string
+literal, and matches no f-string prefix, in the bar's Python sources, e.g.
+rules left behind for removed widgets. Names built any other way would be
+dropped wrongly. Pruning keys the cache on the Python sources too, which
+costs a walk of the tree on every start, so it is off by default.
+"""
+
+import ast
+import hashlib
+import os
+import re
+
+from loguru import logger
+from platformdirs import user_cache_dir
+
+from bar.config import APP_NAME
+
+
+STYLE_CACHE_DIR = os.path.join(user_cache_dir(appname=APP_NAME), "styles")
+# Bump whenever the bundling rules change so cached bundles are rebuilt
+BUNDLER_VERSION = 2
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_RE = re.compile(r"""@import\s+(?:url\()?\s*["']?([^"')\s]+)["']?\s*\)?\s*;""")
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+IDENT_RE = re.compile(r"[#.]([A-Za-z_][\w-]*)")
+NAME_RE = re.compile(r"[\w-]+")
+
+
+def imported_files(path: str, seen: set[str] | None = None) -> list[str]:
+    """`path` and every stylesheet it imports, recursively."""
+    seen = set() if seen is None else seen
+    path = os.path.abspath(path)
+    if path in seen:
+        return []
+    seen.add(path)
+    files = [path]
+    try:
+        with open(path, "r") as f:
+            css = COMMENT_RE.sub("", f.read())
+    except OSError:
+        return files
+    for target in IMPORT_RE.findall(css):
+        files.extend(imported_files(os.path.join(os.path.dirname(path), target), seen))
+    return files
+
+
+def _source_files() -> list[str]:
+    """The Python sources known names are collected from."""
+    files = []
+    for directory, _, names in os.walk(SOURCE_ROOT):
+        if "__pycache__" in directory:
+            continue
+        files.extend(os.path.join(directory, name) for name in names if name.endswith(".py"))
+    return sorted(files)
+
+
+def bundle_key(stylesheet: str, prune: bool = False) -> str:
+    parts = [f"v{BUNDLER_VERSION}", f"prune={prune}", os.path.abspath(stylesheet)]
+    files = imported_files(stylesheet)
+    if prune:
+        files += _source_files()
+    for path in files:
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def known_names(root: str = SOURCE_ROOT) -> tuple[set[str], tuple[str, ...]]:
+    """Widget names and style classes that appear in the bar's sources.
+
+    Returns the complete identifiers found in string literals and the
+    constant prefixes of f-strings (for names like `workspace-button-3`).
+    """
+    names: set[str] = set()
+    prefixes: set[str] = set()
+    for directory, _, files in os.walk(root):
+        for file in files:
+            if not file.endswith(".py"):
+                continue
+            try:
+                with open(os.path.join(directory, file), "r") as f:
+                    tree = ast.parse(f.read())
+            except (OSError, SyntaxError, ValueError):
+                continue
+            for node in ast.walk(tree):
+                if isinstance(node, ast.JoinedStr):
+                    head = node.values[0] if node.values else None
+                    if isinstance(head, ast.Constant) and isinstance(head.value, str):
+                        prefixes.update(NAME_RE.findall(head.value)[-1:])
+                elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                    names.update(NAME_RE.findall(node.value))
+    return names, tuple(p for p in prefixes if p.endswith("-"))
+
+
+def flatten(path: str, seen: set[str] | None = None) -> str:
+    """The stylesheet at `path` with its `@import`s inlined in place."""
+    seen = set() if seen is None else seen
+    path = os.path.abspath(path)
+    if path in seen:
+        return ""
+    seen.add(path)
+    with open(path, "r") as f:
+        css = COMMENT_RE.sub("", f.read())
+
+    def inline(match):
+        target = os.path.join(os.path.dirname(path), match.group(1))
+        return flatten(target, seen)
+
+    return IMPORT_RE.sub(inline, css)
+
+
+def _split_blocks(css: str) -> list[tuple[str, str | None]]:
+    """Split top-level CSS into `(prelude, body)` pairs.
+
+    Statements without a block (`@define-color ...;`) have a None body.
+    """
+    items = []
+    depth = 0
+    start = 0
+    prelude = ""
+    quote = None
+    for i, char in enumerate(css):
+        if quote:
+            if char == quote:
+                quote = None
+            continue
+        if char in "\"'":
+            quote = char
+        elif char == "{":
+            if depth == 0:
+                prelude = css[start:i]
+                start = i + 1
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                items.append((prelude.strip(), css[start:i]))
+                start = i + 1
+        elif char == ";" and depth == 0:
+            items.append((css[start:i].strip(), None))
+            start = i + 1
+    return [(prelude, body) for prelude, body in items if prelude or body]
+
+
+def _minify(text: str) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    return re.sub(r"\s*([{};,>])\s*", r"\1", text)
+
+
+def _selector_used(selector: str, names: set[str], prefixes: tuple[str, ...]) -> bool:
+    for ident in IDENT_RE.findall(selector):
+        if ident not in names and not ident.startswith(prefixes):
+            return False
+    return True
+
+
+def minify(css: str, names: set[str] | None = None, prefixes: tuple[str, ...] = ()) -> tuple[str, int]:
+    """Minify `css`, returning (css, dropped selectors).
+
+    If `names` is given, selectors naming an id or class that is neither in
+    `names` nor starts with one of `prefixes` are dropped.
+    """
+    out = []
+    dropped = 0
+    for prelude, body in _split_blocks(css):
+        if body is None:
+            out.append(f"{_minify(prelude)};")
+            continue
+        if prelude.startswith("@") or prelude.startswith(":"):
+            # @keyframes and fabric's :vars are kept as they are
+            out.append(f"{_minify(prelude)}{{{_minify(body)}}}")
+            continue
+        selectors = [s.strip() for s in prelude.split(",")]
+        if names is None:
+            kept = selectors
+        else:
+            kept = [s for s in selectors if _selector_used(s, names, prefixes)]
+        dropped += len(selectors) - len(kept)
+        if kept:
+            out.append(f"{_minify(','.join(kept))}{{{_minify(body)}}}")
+    return "\n".join(out) + "\n", dropped
+
+
+def _write_atomic(path: str, content: str):
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(keep: str):
+    with os.scandir(STYLE_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.startswith("bundle-") and entry.path != keep:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+def get_bundled_stylesheet(stylesheet: str, prune: bool = False) -> str:
+    """Path to the bundled `stylesheet`, rebuilding it only if a source changed.
+
+    Falls back to `stylesheet` itself if the bundle cannot be written.
+    """
+    path = os.path.join(STYLE_CACHE_DIR, f"bundle-{bundle_key(stylesheet, prune)}.css")
+    if os.path.isfile(path):
+        return path
+
+    try:
+        names, prefixes = known_names() if prune else (None, ())
+        css, dropped = minify(flatten(stylesheet), names, prefixes)
+        os.makedirs(STYLE_CACHE_DIR, exist_ok=True)
+        _write_atomic(path, css)
+        _remove_stale(keep=path)
+    except OSError as e:
+        logger.warning(f"[Styles] Failed to bundle {stylesheet}: {e}")
+        return stylesheet
+    if prune:
+        logger.info(f"[Styles] Bundled {stylesheet}, dropped {dropped} unused selectors")
+    else:
+        logger.info(f"[Styles] Bundled {stylesheet}")
+    return path
@@ -0,0 +1,96 @@
+"""
+Main-loop stall watchdog.
+
+Enabled with `watchdog: {enable: true, stall_ms: 250}` in the config. A
+background thread posts a high-priority idle "ping" to the GLib main loop and
+waits for it to run. If it is not serviced within `stall_ms`, the main
+thread's Python stack is captured with `sys._current_frames()` at that moment,
+and once the loop comes back the stall is logged with its full duration and
+that stack. Between pings the thread sleeps, so the cost is one idle source
+per interval.
+"""
+
+import sys
+import threading
+import time
+import traceback
+
+from gi.repository import GLib
+from loguru import logger
+
+
+PING_INTERVAL = 0.5  # seconds between pings
+
+
+class MainLoopWatchdog:
+    """Logs where the main thread was whenever the main loop stalls."""
+
+    def __init__(self, stall_ms: float = 250, interval: float = PING_INTERVAL):
+        self._stall = stall_ms / 1000
+        self._interval = interval
+        self._main_thread_id = threading.main_thread().ident
+        self._serviced = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Start pinging; call from the main thread once the loop is running."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="main-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"[Watchdog] Watching for main loop stalls over {self._stall * 1000:.0f}ms")
+
+    def stop(self):
+        """Stop for good; a stopped watchdog cannot be restarted."""
+        self._stopped.set()
+        self._serviced.set()
+        self._thread = None
+
+    def _pong(self):
+        self._serviced.set()
+        return False
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._serviced.clear()
+            sent = time.monotonic()
+            GLib.idle_add(self._pong, priority=GLib.PRIORITY_HIGH)
+            if not self._serviced.wait(self._stall):
+                stack = self._main_stack()
+                self._serviced.wait()
+                if self._stopped.is_set():
+                    return
+                stalled = (time.monotonic() - sent) * 1000
+                logger.warning(
+                    f"[Watchdog] Main loop stalled for {stalled:.0f}ms, "
+                    f"main thread after {self._stall * 1000:.0f}ms:\n{stack}"
+                )
+            self._stopped.wait(self._interval)
+
+    def _main_stack(self) -> str:
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return "  <main thread not found>"
+        return "".join(traceback.format_stack(frame)).rstrip()
+
+
+_watchdog: MainLoopWatchdog | None = None
+
+
+def start_watchdog(stall_ms: float = 250) -> MainLoopWatchdog:
+    """Start the process-wide watchdog."""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = MainLoopWatchdog(stall_ms=stall_ms)
+    _watchdog.start()
+    return _watchdog
+
+
+def stop_watchdog():
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
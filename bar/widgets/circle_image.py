@@ -1,13 +1,48 @@
 import math
+from collections.abc import Callable
 from typing import Literal
 
 import cairo
 import gi
 from fabric.core.service import Property
 from fabric.widgets.widget import Widget
+from loguru import logger
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gdk, GdkPixbuf, Gtk  # noqa: E402
+from gi.repository import Gdk, GdkPixbuf, GLib, Gtk  # noqa: E402
+
+
+def load_square_pixbuf(image_file: str, size: int) -> GdkPixbuf.Pixbuf:
+    """Decode an image directly at `size`, center-cropped to a square.
+
+    The decoder scales while reading, so a large cover is never held in
+    memory at full resolution. Safe to call off the main thread.
+    """
+    _, width, height = GdkPixbuf.Pixbuf.get_file_info(image_file)
+    if not width or not height:
+        # Unknown header, let the loader figure it out
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file(image_file)
+        width, height = pixbuf.get_width(), pixbuf.get_height()
+        scale = size / min(width, height)
+        pixbuf = pixbuf.scale_simple(
+            max(size, round(width * scale)),
+            max(size, round(height * scale)),
+            GdkPixbuf.InterpType.BILINEAR,
+        )
+    else:
+        scale = size / min(width, height)
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+            image_file,
+            max(size, round(width * scale)),
+            max(size, round(height * scale)),
+            False,
+        )
+    width, height = pixbuf.get_width(), pixbuf.get_height()
+    if width != size or height != size:
+        pixbuf = pixbuf.new_subpixbuf(
+            (width - size) // 2, (height - size) // 2, size, size
+        ).copy()
+    return pixbuf
 
 
 class CircleImage(Gtk.DrawingArea, Widget):
@@ -65,17 +100,43 @@ class CircleImage(Gtk.DrawingArea, Widget):
             None  # Original image for reprocessing
         )
         self._image: GdkPixbuf.Pixbuf | None = None
+        # The circle-masked image at device resolution; drawing (including
+        # rotation) only composites this, so rebuild it only when it changes.
+        self._surface: cairo.ImageSurface | None = None
+        self._image_file: str | None = None
+        self._load_serial = 0  # Drops decodes superseded by a newer image
         if image_file:
-            pix = GdkPixbuf.Pixbuf.new_from_file(image_file)
-            self._orig_image = pix
-            self._image = self._process_image(pix)
+            self.set_image_from_file(image_file)
         elif pixbuf:
             self._orig_image = pixbuf
             self._image = self._process_image(pixbuf)
         self.connect("draw", self.on_draw)
+        self.connect("notify::scale-factor", lambda *_: self._invalidate_surface())
+
+    @property
+    def pixel_size(self) -> int:
+        """The image edge length in device pixels."""
+        return self.size * self.get_scale_factor()
+
+    def _invalidate_surface(self):
+        self._surface = None
+        self.queue_draw()
+
+    def _build_surface(self) -> cairo.ImageSurface:
+        scale = self.get_scale_factor()
+        pixels = self.size * scale
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, pixels, pixels)
+        ctx = cairo.Context(surface)
+        ctx.arc(pixels / 2, pixels / 2, pixels / 2, 0, 2 * math.pi)
+        ctx.clip()
+        ctx.scale(pixels / self._image.get_width(), pixels / self._image.get_height())
+        Gdk.cairo_set_source_pixbuf(ctx, self._image, 0, 0)
+        ctx.paint()
+        surface.set_device_scale(scale, scale)
+        return surface
 
     def _process_image(self, pixbuf: GdkPixbuf.Pixbuf) -> GdkPixbuf.Pixbuf:
-        """Crop the image to a centered square and scale it to the widget’s size."""
+        """Crop the image to a centered square and scale it to the widget’s pixel size."""
         width, height = pixbuf.get_width(), pixbuf.get_height()
         if width != height:
             square_size = min(width, height)
@@ -84,43 +145,76 @@ class CircleImage(Gtk.DrawingArea, Widget):
             pixbuf = pixbuf.new_subpixbuf(x_offset, y_offset, square_size, square_size)
         else:
             square_size = width
-        if square_size != self.size:
+        pixel_size = self.pixel_size
+        if square_size != pixel_size:
             pixbuf = pixbuf.scale_simple(
-                self.size, self.size, GdkPixbuf.InterpType.BILINEAR
+                pixel_size, pixel_size, GdkPixbuf.InterpType.BILINEAR
             )
         return pixbuf
 
     def on_draw(self, widget: "CircleImage", ctx: cairo.Context):
         if self._image:
+            if self._surface is None:
+                self._surface = self._build_surface()
             ctx.save()
-            # Create a circular clipping path
-            ctx.arc(self.size / 2, self.size / 2, self.size / 2, 0, 2 * math.pi)
-            ctx.clip()
             # Rotate around the center of the square image
             ctx.translate(self.size / 2, self.size / 2)
             ctx.rotate(self._angle * math.pi / 180.0)
             ctx.translate(-self.size / 2, -self.size / 2)
-            Gdk.cairo_set_source_pixbuf(ctx, self._image, 0, 0)
+            ctx.set_source_surface(self._surface, 0, 0)
             ctx.paint()
             ctx.restore()
 
-    def set_image_from_file(self, new_image_file: str):
+    def set_image_from_file(
+        self,
+        new_image_file: str,
+        on_loaded: Callable[[GdkPixbuf.Pixbuf], None] | None = None,
+    ):
+        """Decode `new_image_file` at the widget's pixel size on a worker thread.
+
+        The current image stays up until the new one is ready. `on_loaded`
+        receives the decoded square pixbuf on the main thread.
+        """
         if not new_image_file:
             return
-        pixbuf = GdkPixbuf.Pixbuf.new_from_file(new_image_file)
-        self._orig_image = pixbuf
-        self._image = self._process_image(pixbuf)
-        self.queue_draw()
+        self._load_serial += 1
+        serial, size = self._load_serial, self.pixel_size
+
+        def decode(*_):
+            try:
+                pixbuf = load_square_pixbuf(new_image_file, size)
+            except GLib.Error as e:
+                logger.warning(f"[CircleImage] Failed to load {new_image_file}: {e}")
+                return None
+            GLib.idle_add(finish, pixbuf)
+            return None
+
+        def finish(pixbuf: GdkPixbuf.Pixbuf):
+            if serial != self._load_serial:
+                return False
+            self._image_file = new_image_file
+            self._orig_image = None
+            self._image = pixbuf
+            self._invalidate_surface()
+            if on_loaded:
+                on_loaded(pixbuf)
+            return False
+
+        GLib.Thread.new("decode-image", decode, None)
 
     def set_image_from_pixbuf(self, pixbuf: GdkPixbuf.Pixbuf):
         if not pixbuf:
             return
+        self._load_serial += 1
+        self._image_file = None
         self._orig_image = pixbuf
         self._image = self._process_image(pixbuf)
-        self.queue_draw()
+        self._invalidate_surface()
 
     def set_image_size(self, size: int):
         self.size = size
         if self._orig_image:
             self._image = self._process_image(self._orig_image)
-        self.queue_draw()
+        elif self._image_file:
+            self.set_image_from_file(self._image_file)
+        self._invalidate_surface()
@@ -2,14 +2,22 @@
 Fenster widgets for workspace and window management via sway IPC.
 """
 
-from gi.repository import GLib
+import math
+
+import cairo
+from gi.repository import Gdk, GLib, Gtk
 
 from fabric.i3 import I3, I3Event, I3MessageType
 from fabric.utils.helpers import bulk_connect
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
+from fabric.widgets.eventbox import EventBox
 from fabric.widgets.label import Label
 from bar.services.fenster import get_i3_connection
+from bar.services.snapshot import get_snapshot
+
+
+STATE_CLASSES = ("active", "visible", "empty", "urgent")
 
 
 class FensterWorkspaceButton(Button):
@@ -61,6 +69,10 @@ class FensterWorkspaceButton(Button):
     def set_urgent(self, urgent: bool):
         self._toggle_class("urgent", urgent)
 
+    def get_state_classes(self) -> list[str]:
+        context = self.get_style_context()
+        return [name for name in STATE_CLASSES if context.has_class(name)]
+
 
 class FensterWorkspaces(Box):
     """Container widget showing a fixed set of workspace bubbles (1..N)."""
@@ -91,9 +103,16 @@ class FensterWorkspaces(Box):
         for n in range(1, workspace_count + 1):
             button = self._buttons_factory(n)
             self._buttons[n] = button
-            self.add(button)
+            self._add_slot(button)
 
-        bulk_connect(
+        # Last run's layout for this output, until the first GET_WORKSPACES reply
+        if output:
+            self._snapshot_section = f"workspaces:{output}"
+            self._restore_snapshot()
+            get_snapshot().register(self._snapshot_section, self._snapshot_state)
+
+        # Disconnected on destroy, bars come and go with outputs and reloads
+        self._i3_handlers = bulk_connect(
             self._i3,
             {
                 "event::workspace::focus": self._on_event,
@@ -106,12 +125,37 @@ class FensterWorkspaces(Box):
                 "event::window::close": self._on_event,
             },
         )
+        self.connect("destroy", self._on_destroy)
 
         if self._i3.ready:
             self._schedule_refresh()
         else:
             self._i3.connect("notify::ready", lambda *_: self._schedule_refresh())
 
+    def _add_slot(self, button):
+        self.add(button)
+
+    def _on_destroy(self, *_):
+        for handler_id in self._i3_handlers:
+            self._i3.disconnect(handler_id)
+        self._i3_handlers = []
+        if self._output:
+            get_snapshot().unregister(self._snapshot_section, self._snapshot_state)
+
+    def _restore_snapshot(self):
+        saved = get_snapshot().get(self._snapshot_section, {})
+        for n, button in self._buttons.items():
+            classes = saved.get(str(n))
+            if classes is None:
+                continue
+            for name in STATE_CLASSES:
+                button._toggle_class(name, name in classes)
+
+    def _snapshot_state(self) -> dict:
+        return {
+            str(n): button.get_state_classes() for n, button in self._buttons.items()
+        }
+
     def _default_button_factory(self, workspace_num: int) -> FensterWorkspaceButton:
         return FensterWorkspaceButton(workspace_num=workspace_num, i3=self._i3)
 
@@ -165,6 +209,213 @@ class FensterWorkspaces(Box):
         self.show_all()
 
 
+class WorkspacePill:
+    """State of one drawn workspace pill, with the setters of FensterWorkspaceButton"""
+
+    def __init__(self, workspace_num: int, on_changed):
+        self._workspace_num = workspace_num
+        self._on_changed = on_changed
+        self.classes: set[str] = set()
+        # Animated state, eased towards the targets derived from `classes`
+        self.width: float | None = None
+        self.color: tuple[float, float, float, float] | None = None
+
+    @property
+    def workspace_num(self) -> int:
+        return self._workspace_num
+
+    def _toggle_class(self, name: str, on: bool):
+        if (name in self.classes) == on:
+            return
+        if on:
+            self.classes.add(name)
+        else:
+            self.classes.discard(name)
+        self._on_changed()
+
+    def set_active(self, active: bool):
+        self._toggle_class("active", active)
+
+    def set_visible_other(self, visible: bool):
+        self._toggle_class("visible", visible)
+
+    def set_empty(self, empty: bool):
+        self._toggle_class("empty", empty)
+
+    def set_urgent(self, urgent: bool):
+        self._toggle_class("urgent", urgent)
+
+    def get_state_classes(self) -> list[str]:
+        return [name for name in STATE_CLASSES if name in self.classes]
+
+
+class FensterWorkspacePills(FensterWorkspaces):
+    """Workspace bubbles drawn into a single area of constant size.
+
+    The active pill grows by easing its drawn width, so switching workspaces
+    only redraws this widget and never renegotiates the bar's layout. Pill
+    colors come from the `color` of `#workspace-pills` with the state classes
+    (`active`, `visible`, `empty`, `urgent`) and `:hover`.
+    """
+
+    def __init__(
+        self,
+        pill_width: int = 16,
+        active_pill_width: int = 64,
+        pill_spacing: int = 4,
+        duration: int = 150,
+        **kwargs,
+    ):
+        self._pill_width = pill_width
+        self._active_pill_width = active_pill_width
+        self._pill_spacing = pill_spacing
+        self._duration = duration * 1000  # µs
+        self._hovered: WorkspacePill | None = None
+        self._tick_id = None
+        self._last_frame = None
+
+        self._area = Gtk.DrawingArea(name="workspace-pills")
+        self._area.connect("draw", self._on_draw)
+        self._event_box = EventBox(
+            events=["button-press", "pointer-motion", "leave-notify"],
+            child=self._area,
+        )
+        self._event_box.set_visible_window(False)
+        self._event_box.connect("button-press-event", self._on_press)
+        self._event_box.connect("motion-notify-event", self._on_motion)
+        self._event_box.connect("leave-notify-event", self._on_leave)
+
+        super().__init__(buttons_factory=self._pill_factory, **kwargs)
+        self.add(self._event_box)
+
+        count = len(self._buttons)
+        # Room for every pill at rest plus one grown to the active width
+        width = (
+            count * pill_width
+            + (active_pill_width - pill_width)
+            + (count - 1) * pill_spacing
+        )
+        self._area.set_size_request(width, -1)
+
+    def _pill_factory(self, workspace_num: int) -> WorkspacePill:
+        return WorkspacePill(workspace_num, self._animate)
+
+    def _add_slot(self, button):
+        pass  # Pills are drawn, not packed
+
+    def _target_width(self, pill: WorkspacePill) -> float:
+        return self._active_pill_width if "active" in pill.classes else self._pill_width
+
+    def _target_color(self, pill: WorkspacePill):
+        context = self._area.get_style_context()
+        context.save()
+        for name in pill.classes:
+            context.add_class(name)
+        # The area is hovered as a whole; only the pill under the pointer is
+        state = context.get_state() & ~Gtk.StateFlags.PRELIGHT
+        if pill is self._hovered:
+            state |= Gtk.StateFlags.PRELIGHT
+        context.set_state(state)
+        color = context.get_color(context.get_state())
+        context.restore()
+        return (color.red, color.green, color.blue, color.alpha)
+
+    def _animate(self):
+        if self._tick_id is None:
+            self._last_frame = None
+            self._tick_id = self._area.add_tick_callback(self._on_tick)
+
+    def _on_tick(self, widget, frame_clock):
+        now = frame_clock.get_frame_time()
+        elapsed = now - self._last_frame if self._last_frame else 0
+        self._last_frame = now
+        # Exponential ease, settling within `duration`
+        step = 1.0 - math.exp(-5 * elapsed / self._duration) if self._duration else 1.0
+
+        settled = True
+        for pill in self._buttons.values():
+            target_width = self._target_width(pill)
+            target_color = self._target_color(pill)
+            if pill.width is None:
+                pill.width, pill.color = target_width, target_color
+                continue
+            pill.width += (target_width - pill.width) * step
+            pill.color = tuple(
+                c + (t - c) * step for c, t in zip(pill.color, target_color)
+            )
+            if abs(pill.width - target_width) > 0.5 or any(
+                abs(c - t) > 0.01 for c, t in zip(pill.color, target_color)
+            ):
+                settled = False
+            else:
+                pill.width, pill.color = target_width, target_color
+            if "urgent" in pill.classes:
+                settled = False  # Keep ticking for the blink
+
+        widget.queue_draw()
+        if settled:
+            self._tick_id = None
+            return False
+        return True
+
+    def _layout(self) -> list[tuple[WorkspacePill, float, float]]:
+        """Pills with their drawn x offset and width, centered in the area."""
+        pills = list(self._buttons.values())
+        widths = [
+            pill.width if pill.width is not None else self._target_width(pill)
+            for pill in pills
+        ]
+        used = sum(widths) + self._pill_spacing * (len(pills) - 1)
+        x = (self._area.get_allocated_width() - used) / 2
+        placed = []
+        for pill, width in zip(pills, widths):
+            placed.append((pill, x, width))
+            x += width + self._pill_spacing
+        return placed
+
+    def _on_draw(self, widget: Gtk.DrawingArea, ctx: cairo.Context):
+        height = widget.get_allocated_height()
+        radius = height / 2
+        now = GLib.get_monotonic_time()
+        for pill, x, width in self._layout():
+            color = pill.color or self._target_color(pill)
+            alpha = color[3]
+            if "urgent" in pill.classes:
+                # Blink through opacity, once a second
+                alpha *= 0.75 + 0.25 * math.cos(2 * math.pi * now / 1000000)
+            ctx.set_source_rgba(color[0], color[1], color[2], alpha)
+            ctx.new_sub_path()
+            ctx.arc(x + width - radius, radius, radius, -math.pi / 2, math.pi / 2)
+            ctx.arc(x + radius, radius, radius, math.pi / 2, 3 * math.pi / 2)
+            ctx.close_path()
+            ctx.fill()
+
+    def _pill_at(self, x: float) -> WorkspacePill | None:
+        for pill, start, width in self._layout():
+            if start - self._pill_spacing / 2 <= x < start + width + self._pill_spacing / 2:
+                return pill
+        return None
+
+    def _on_press(self, widget, event: Gdk.EventButton):
+        pill = self._pill_at(event.x)
+        if pill is not None:
+            self._i3.send_command(f"workspace number {pill.workspace_num}")
+        return True
+
+    def _on_motion(self, widget, event: Gdk.EventMotion):
+        pill = self._pill_at(event.x)
+        if pill is not self._hovered:
+            self._hovered = pill
+            self._animate()
+        return False
+
+    def _on_leave(self, widget, event):
+        if self._hovered is not None:
+            self._hovered = None
+            self._animate()
+        return False
+
+
 class FensterActiveWindow(Label):
     """Label showing the title of the focused window"""
 
@@ -183,7 +434,7 @@ class FensterActiveWindow(Label):
         self._i3 = i3 or get_i3_connection()
         self._max_length = max_length
 
-        bulk_connect(
+        self._i3_handlers = bulk_connect(
             self._i3,
             {
                 "event::window::focus": self._on_window_event,
@@ -191,12 +442,18 @@ class FensterActiveWindow(Label):
                 "event::window::close": self._on_window_close,
             },
         )
+        self.connect("destroy", self._on_destroy)
 
         if self._i3.ready:
             self._initialize()
         else:
             self._i3.connect("notify::ready", lambda *_: self._initialize())
 
+    def _on_destroy(self, *_):
+        for handler_id in self._i3_handlers:
+            self._i3.disconnect(handler_id)
+        self._i3_handlers = []
+
     def _initialize(self):
         tree_reply = I3.send_command("", I3MessageType.GET_TREE)
         if tree_reply.is_ok and isinstance(tree_reply.reply, dict):
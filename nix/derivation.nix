@@ -12,6 +12,7 @@
   wrapGAppsHook3,
   playerctl,
   webp-pixbuf-loader,
+  pulseaudio,
   notmuch,
   khal,
   emacs,
@@ -50,6 +51,7 @@ python3Packages.buildPythonApplication {
     pywayland
     pyyaml
     platformdirs
+    numpy
   ];
   doCheck = false;
   dontWrapGApps = true;
@@ -71,7 +73,7 @@ python3Packages.buildPythonApplication {
 
   preFixup = ''
     makeWrapperArgs+=("''${gappsWrapperArgs[@]}")
-    makeWrapperArgs+=(--prefix PATH : ${lib.makeBinPath [ khal notmuch emacs ]})
+    makeWrapperArgs+=(--prefix PATH : ${lib.makeBinPath [ khal notmuch emacs pulseaudio ]})
   '';
 
   passthru = {
@@ -43,6 +43,7 @@ pkgs.mkShell {
         python-lsp-ruff
         pyyaml
         platformdirs
+        numpy
       ]
     ))
   ];
@@ -14,6 +14,11 @@ site_packages_dir = os.path.join(
 if site_packages_dir not in sys.path:
     sys.path.insert(0, site_packages_dir)
 
+# `bar msg ...` talks to the running bar; keep it free of GTK imports
+if sys.argv[1:2] == ["msg"]:
+    from bar.msg import main as msg_main
+
+    sys.exit(msg_main(sys.argv[2:]))
 
 from bar.main import *
 
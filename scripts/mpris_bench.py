@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Signal-storm benchmark for the MPRIS player pipeline.
+
+Starts scriptable fake MPRIS players on a private session bus
+(`dbus-run-session`) and drives `MprisPlayerManager`, `MprisPlayer` and
+`PlayerBox` with metadata, seek and playback-status storms. Reports main-loop
+dispatches, `changed` emissions, D-Bus reads served by the fake players and
+the latency from a metadata change to the title label update.
+
+    python scripts/mpris_bench.py --players 3 --metadata-rate 20 --duration 10
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gio, GLib  # noqa: E402
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+BUS_ENV = "MAKKU_BENCH_PRIVATE_BUS"
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+TRACK_LENGTH = 240 * 1000000  # µs
+
+MPRIS_XML = """
+<node>
+  <interface name="org.mpris.MediaPlayer2">
+    <method name="Raise"/>
+    <method name="Quit"/>
+    <property name="CanQuit" type="b" access="read"/>
+    <property name="CanRaise" type="b" access="read"/>
+    <property name="HasTrackList" type="b" access="read"/>
+    <property name="Identity" type="s" access="read"/>
+    <property name="SupportedUriSchemes" type="as" access="read"/>
+    <property name="SupportedMimeTypes" type="as" access="read"/>
+  </interface>
+  <interface name="org.mpris.MediaPlayer2.Player">
+    <method name="Next"/>
+    <method name="Previous"/>
+    <method name="Pause"/>
+    <method name="PlayPause"/>
+    <method name="Stop"/>
+    <method name="Play"/>
+    <method name="Seek"><arg direction="in" name="Offset" type="x"/></method>
+    <method name="SetPosition">
+      <arg direction="in" name="TrackId" type="o"/>
+      <arg direction="in" name="Position" type="x"/>
+    </method>
+    <method name="OpenUri"><arg direction="in" name="Uri" type="s"/></method>
+    <signal name="Seeked"><arg name="Position" type="x"/></signal>
+    <property name="PlaybackStatus" type="s" access="read"/>
+    <property name="LoopStatus" type="s" access="readwrite"/>
+    <property name="Rate" type="d" access="readwrite"/>
+    <property name="Shuffle" type="b" access="readwrite"/>
+    <property name="Metadata" type="a{sv}" access="read"/>
+    <property name="Volume" type="d" access="readwrite"/>
+    <property name="Position" type="x" access="read"/>
+    <property name="MinimumRate" type="d" access="read"/>
+    <property name="MaximumRate" type="d" access="read"/>
+    <property name="CanGoNext" type="b" access="read"/>
+    <property name="CanGoPrevious" type="b" access="read"/>
+    <property name="CanPlay" type="b" access="read"/>
+    <property name="CanPause" type="b" access="read"/>
+    <property name="CanSeek" type="b" access="read"/>
+    <property name="CanControl" type="b" access="read"/>
+  </interface>
+</node>
+"""
+
+
+class FakePlayer:
+    """A scriptable MPRIS player that emits change storms at fixed rates."""
+
+    def __init__(
+        self, name: str, metadata_rate: float, seek_rate: float, status_rate: float
+    ):
+        self._name = name
+        self._rates = (metadata_rate, seek_rate, status_rate)
+        self._connection: Gio.DBusConnection | None = None
+        self._track = 0
+        self._playing = True
+        self._position = 0
+        self._metadata = self._make_metadata()
+        self.stats: dict[str, int] = {
+            "emitted": 0,
+            "property-reads": 0,
+            "position-reads": 0,
+            "method-calls": 0,
+        }
+
+    def start(self):
+        Gio.bus_own_name(
+            Gio.BusType.SESSION,
+            f"org.mpris.MediaPlayer2.{self._name}",
+            Gio.BusNameOwnerFlags.NONE,
+            self._on_bus_acquired,
+            None,
+            None,
+        )
+
+    def _on_bus_acquired(self, connection, name):
+        self._connection = connection
+        for interface in Gio.DBusNodeInfo.new_for_xml(MPRIS_XML).interfaces:
+            connection.register_object(
+                MPRIS_PATH,
+                interface,
+                self._on_method_call,
+                self._on_get_property,
+                self._on_set_property,
+            )
+        metadata_rate, seek_rate, status_rate = self._rates
+        for rate, storm in (
+            (metadata_rate, self._next_track),
+            (seek_rate, self._seek),
+            (status_rate, self._toggle_status),
+        ):
+            if rate > 0:
+                GLib.timeout_add(max(1, int(1000 / rate)), storm)
+
+    def _make_metadata(self) -> dict:
+        # The title carries the emission time so the harness can measure latency
+        return {
+            "mpris:trackid": GLib.Variant("o", f"/bench/track/{self._track}"),
+            "mpris:length": GLib.Variant("x", TRACK_LENGTH),
+            "xesam:title": GLib.Variant(
+                "s", f"bench {self._track} {GLib.get_monotonic_time()}"
+            ),
+            "xesam:artist": GLib.Variant("as", [f"artist {self._track % 7}"]),
+            "xesam:album": GLib.Variant("s", f"album {self._track % 3}"),
+        }
+
+    def _emit_changed(self, **props):
+        self._connection.emit_signal(
+            None,
+            MPRIS_PATH,
+            "org.freedesktop.DBus.Properties",
+            "PropertiesChanged",
+            GLib.Variant("(sa{sv}as)", ("org.mpris.MediaPlayer2.Player", props, [])),
+        )
+        self.stats["emitted"] += 1
+
+    def _next_track(self):
+        self._track += 1
+        self._position = 0
+        self._metadata = self._make_metadata()
+        self._emit_changed(Metadata=GLib.Variant("a{sv}", self._metadata))
+        return True
+
+    def _seek(self):
+        self._position = (self._position + 7919 * 1000) % TRACK_LENGTH
+        self._connection.emit_signal(
+            None,
+            MPRIS_PATH,
+            "org.mpris.MediaPlayer2.Player",
+            "Seeked",
+            GLib.Variant("(x)", (self._position,)),
+        )
+        self.stats["emitted"] += 1
+        return True
+
+    def _toggle_status(self):
+        self._playing = not self._playing
+        self._emit_changed(
+            PlaybackStatus=GLib.Variant("s", "Playing" if self._playing else "Paused")
+        )
+        return True
+
+    def _on_method_call(
+        self, connection, sender, path, interface, method, params, invocation
+    ):
+        self.stats["method-calls"] += 1
+        if method == "SetPosition":
+            self._position = params.unpack()[1]
+        elif method == "Seek":
+            self._position = max(0, self._position + params.unpack()[0])
+        invocation.return_value(None)
+
+    def _on_get_property(self, connection, sender, path, interface, prop):
+        self.stats["property-reads"] += 1
+        if prop == "Position":
+            self.stats["position-reads"] += 1
+        values = {
+            "PlaybackStatus": GLib.Variant(
+                "s", "Playing" if self._playing else "Paused"
+            ),
+            "LoopStatus": GLib.Variant("s", "None"),
+            "Rate": GLib.Variant("d", 1.0),
+            "Shuffle": GLib.Variant("b", False),
+            "Metadata": GLib.Variant("a{sv}", self._metadata),
+            "Volume": GLib.Variant("d", 1.0),
+            "Position": GLib.Variant("x", self._position),
+            "MinimumRate": GLib.Variant("d", 1.0),
+            "MaximumRate": GLib.Variant("d", 1.0),
+            "Identity": GLib.Variant("s", self._name),
+            "SupportedUriSchemes": GLib.Variant("as", []),
+            "SupportedMimeTypes": GLib.Variant("as", []),
+        }
+        return values.get(prop, GLib.Variant("b", True))
+
+    def _on_set_property(self, connection, sender, path, interface, prop, value):
+        return True
+
+
+def serve_player(args):
+    """Child process: run one fake player until SIGTERM, then print its stats."""
+    player = FakePlayer(
+        args.serve, args.metadata_rate, args.seek_rate, args.status_rate
+    )
+    loop = GLib.MainLoop()
+
+    def on_term():
+        print(json.dumps(player.stats), flush=True)
+        loop.quit()
+        return False
+
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, on_term)
+    player.start()
+    loop.run()
+
+
+class DispatchCounter:
+    """Counts callbacks dispatched from GLib idle and timeout sources."""
+
+    def __init__(self):
+        self.count = 0
+        self.enabled = False
+
+    def install(self):
+        for name in ("idle_add", "timeout_add", "timeout_add_seconds"):
+            setattr(GLib, name, self._wrap(getattr(GLib, name)))
+
+    def _wrap(self, add_source):
+        def patched(*args, **kwargs):
+            args = list(args)
+            index = next(i for i, arg in enumerate(args) if callable(arg))
+            callback = args[index]
+
+            def counted(*cb_args):
+                if self.enabled:
+                    self.count += 1
+                return callback(*cb_args)
+
+            args[index] = counted
+            return add_source(*args, **kwargs)
+
+        return patched
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.dispatches = DispatchCounter()
+        self.changed = 0
+        self.latencies: list[int] = []
+        self.players: list = []  # Keeps MprisPlayer and PlayerBox objects alive
+
+    def track(self, playerctl_player):
+        from bar.services.mpris import MprisPlayer
+
+        mp = MprisPlayer(playerctl_player)
+        if not mp.player_name.startswith("bench"):
+            return
+        mp.connect("changed", self._on_changed)
+        if self.args.no_widgets:
+            mp.connect("changed", lambda p: self._record_latency(p.title))
+            self.players.append(mp)
+            return
+
+        from bar.modules.player import PlayerBox
+
+        box = PlayerBox(mpris_player=mp)
+        box.title.connect(
+            "notify::label", lambda label, _: self._record_latency(label.get_label())
+        )
+        self.players.append((mp, box))
+
+    def _on_changed(self, *_):
+        if self.dispatches.enabled:
+            self.changed += 1
+
+    def _record_latency(self, title: str):
+        parts = (title or "").split()
+        if self.dispatches.enabled and len(parts) == 3 and parts[0] == "bench":
+            self.latencies.append(GLib.get_monotonic_time() - int(parts[2]))
+
+
+def report(args, harness: Harness, player_stats: list[dict]):
+    seconds = args.duration
+    print(
+        f"players={args.players} metadata={args.metadata_rate}/s "
+        f"seek={args.seek_rate}/s status={args.status_rate}/s "
+        f"duration={seconds}s widgets={not args.no_widgets}"
+    )
+    rows = [
+        ("signals emitted by players", sum(s["emitted"] for s in player_stats)),
+        ("property reads served", sum(s["property-reads"] for s in player_stats)),
+        ("  of which Position", sum(s["position-reads"] for s in player_stats)),
+        ("method calls served", sum(s["method-calls"] for s in player_stats)),
+        ("main-loop dispatches", harness.dispatches.count),
+        ("changed emissions", harness.changed),
+    ]
+    for name, total in rows:
+        print(f"{name:<28}{total:>10}{total / seconds:>12.1f}/s")
+    if harness.latencies:
+        latencies = sorted(harness.latencies)
+        p95 = (
+            latencies[int(len(latencies) * 0.95) - 1]
+            if len(latencies) >= 20
+            else latencies[-1]
+        )
+        p50 = statistics.median(latencies)
+        print(
+            f"{'signal->label latency':<28}p50={p50 / 1000:.2f}ms "
+            f"p95={p95 / 1000:.2f}ms max={latencies[-1] / 1000:.2f}ms "
+            f"n={len(latencies)}"
+        )
+    else:
+        print("signal->label latency       no samples")
+
+
+def run(args):
+    children = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                __file__,
+                "--serve",
+                f"bench{i}",
+                "--metadata-rate",
+                str(args.metadata_rate),
+                "--seek-rate",
+                str(args.seek_rate),
+                "--status-rate",
+                str(args.status_rate),
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for i in range(args.players)
+    ]
+
+    harness = Harness(args)
+    harness.dispatches.install()
+    # bar.config reads the config path from argv at import time
+    sys.argv = [sys.argv[0], "--config", args.config]
+    sys.path.insert(0, REPO_ROOT)
+    from bar.services.mpris import MprisPlayerManager
+
+    if not args.no_widgets:
+        from gi.repository import Gdk
+
+        if Gdk.Display.get_default() is None:
+            print("No display available, running with --no-widgets")
+            args.no_widgets = True
+
+    manager = MprisPlayerManager()
+    # Players already on the bus are added without a player-appeared signal
+    for player in manager.players or []:
+        harness.track(player)
+    manager.connect("player-appeared", lambda _, player: harness.track(player))
+    loop = GLib.MainLoop()
+
+    def start_measuring():
+        harness.dispatches.enabled = True
+        GLib.timeout_add(int(args.duration * 1000), loop.quit)
+        return False
+
+    GLib.timeout_add(int(args.warmup * 1000), start_measuring)
+    loop.run()
+
+    player_stats = []
+    for child in children:
+        child.send_signal(signal.SIGTERM)
+        out, _ = child.communicate(timeout=5)
+        player_stats.append(json.loads(out.strip().splitlines()[-1]))
+    report(args, harness, player_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="MPRIS pipeline signal-storm benchmark"
+    )
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument(
+        "--metadata-rate",
+        type=float,
+        default=10.0,
+        help="track changes per second per player",
+    )
+    parser.add_argument(
+        "--seek-rate",
+        type=float,
+        default=10.0,
+        help="Seeked signals per second per player",
+    )
+    parser.add_argument(
+        "--status-rate",
+        type=float,
+        default=2.0,
+        help="PlaybackStatus flips per second per player",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="seconds before measuring starts"
+    )
+    parser.add_argument(
+        "--no-widgets",
+        action="store_true",
+        help="benchmark the services without PlayerBox",
+    )
+    parser.add_argument("--config", default=os.path.join(REPO_ROOT, "example.yaml"))
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_player(args)
+        return
+
+    if not os.environ.get(BUS_ENV):
+        # Re-run on a private session bus so real players stay out of the numbers
+        os.environ[BUS_ENV] = "1"
+        os.execvp(
+            "dbus-run-session",
+            ["dbus-run-session", "--", sys.executable, __file__, *sys.argv[1:]],
+        )
+
+    run(args)
+
+
+if __name__ == "__main__":
+    main()